@@ -0,0 +1,28 @@
+"""
+CitizenAI ASGI entry point
+
+Serves app.py from an ASGI server. Requests run on a fixed pool of WSGI
+threads sized above the inference queue's capacity, so even with every
+inference slot busy there are threads left for pages, static files and
+the dashboard; questions beyond the queue are answered with a fast 503.
+
+    pip install -r requirements-asgi.txt
+    uvicorn asgi:application --host 0.0.0.0 --port 5000
+"""
+
+import os
+
+try:
+    from a2wsgi import WSGIMiddleware
+except ImportError as e:
+    raise ImportError("ASGI mode needs a2wsgi and an ASGI server: pip install -r requirements-asgi.txt") from e
+
+import app as citizenai
+
+# Threads beyond the inference capacity are kept for non-inference routes
+inference_queue = citizenai.responder.inference_queue
+capacity = inference_queue.capacity if inference_queue is not None else 0
+ASGI_THREADS = int(os.environ.get('CITIZENAI_ASGI_THREADS', str(capacity + 16)))
+
+citizenai.responder.start()
+application = WSGIMiddleware(citizenai.app, workers=ASGI_THREADS)
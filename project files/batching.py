@@ -0,0 +1,131 @@
+"""
+CitizenAI Dynamic Batching
+
+Collects concurrent generation requests over a short window and runs them
+through a single batched call, handing each caller back its own result.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class BatchScheduler:
+    """Background scheduler that groups submitted items into batches.
+
+    ``batch_fn`` receives a list of items and must return a list of results
+    of the same length and order. A batch is dispatched as soon as
+    ``max_batch_size`` items are waiting or ``max_wait_ms`` has elapsed since
+    the first item of the batch arrived, whichever comes first.
+    ``observe_wait``, if given, is called with each item's queueing delay in
+    seconds just before its batch runs.
+    """
+
+    def __init__(self, batch_fn, max_batch_size=8, max_wait_ms=20.0, name="citizenai-batcher", observe_wait=None):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.name = name
+        self.observe_wait = observe_wait
+
+        self._queue = queue.Queue()
+        self._thread = None
+        self._stopped = threading.Event()
+
+        # Simple counters for monitoring
+        self.batches_run = 0
+        self.items_processed = 0
+
+    def start(self):
+        """Start the dispatcher thread (idempotent)."""
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        """Stop the dispatcher thread after draining the current batch."""
+        self._stopped.set()
+        self._queue.put(None)
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def submit(self, item):
+        """Queue an item and return a Future resolving to its result."""
+        if self._stopped.is_set():
+            raise RuntimeError("BatchScheduler is stopped")
+        future = Future()
+        self._queue.put((item, future, time.perf_counter()))
+        return future
+
+    def stats(self):
+        """Return batching counters."""
+        return {
+            'batches_run': self.batches_run,
+            'items_processed': self.items_processed,
+            'avg_batch_size': (self.items_processed / self.batches_run) if self.batches_run else 0.0,
+            'pending': self._queue.qsize(),
+        }
+
+    def _collect_batch(self):
+        """Block for the first item, then gather more until full or timed out."""
+        first = self._queue.get()
+        if first is None:
+            return None
+
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is None:
+                self._stopped.set()
+                break
+            batch.append(entry)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            if batch is None:
+                break
+
+            # Skip callers that gave up before the batch ran
+            batch = [entry for entry in batch if entry[1].set_running_or_notify_cancel()]
+            if batch:
+                self._dispatch(batch)
+
+            if self._stopped.is_set() and self._queue.empty():
+                break
+
+    def _dispatch(self, batch):
+        if self.observe_wait is not None:
+            now = time.perf_counter()
+            for _, _, enqueued_at in batch:
+                self.observe_wait(now - enqueued_at)
+
+        items = [item for item, _, _ in batch]
+        try:
+            results = self.batch_fn(items)
+            if len(results) != len(items):
+                raise RuntimeError(
+                    f"batch_fn returned {len(results)} results for {len(items)} items"
+                )
+        except Exception as e:
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+
+        self.batches_run += 1
+        self.items_processed += len(items)
+        for (_, future, _), result in zip(batch, results):
+            future.set_result(result)
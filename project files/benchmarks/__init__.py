@@ -0,0 +1,6 @@
+"""
+CitizenAI Benchmarks
+
+Offline benchmark scripts. Run them from the ``project files`` directory, e.g.
+``python -m benchmarks.bench_batching``.
+"""
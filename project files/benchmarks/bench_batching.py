@@ -0,0 +1,81 @@
+"""
+Benchmark: dynamic batching vs. one generate call per request.
+
+Fires concurrent questions at ``granite.granite_generate_response`` backed by a
+tiny local model, once with batching disabled and once enabled, and reports
+requests/sec for each. The response cache is disabled so both runs generate
+every answer instead of repeating the first run's cached ones. Exits with
+status 1 unless batching raises throughput with batches of more than one
+request.
+
+    python -m benchmarks.bench_batching --requests 64 --concurrency 16
+"""
+
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import granite
+from batching import BatchScheduler
+from benchmarks.tiny_model import build_tiny_pair
+from response_cache import ResponseCache
+
+QUESTIONS = [
+    "how do i pay my taxes",
+    "when is trash pickup",
+    "how do i register to vote",
+    "report pothole on my street",
+    "what are the park hours",
+    "apply for permit",
+]
+
+
+def run_load(total_requests, concurrency):
+    """Send ``total_requests`` questions from ``concurrency`` threads; return req/s."""
+    questions = [QUESTIONS[i % len(QUESTIONS)] for i in range(total_requests)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(granite.granite_generate_response, questions))
+    return total_requests / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CitizenAI dynamic batching benchmark")
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--wait-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    granite.tokenizer, granite.model = build_tiny_pair()
+    granite.device = "cpu"
+    granite.response_cache = ResponseCache(max_entries=0)
+
+    granite.batch_scheduler = None
+    unbatched = run_load(args.requests, args.concurrency)
+
+    granite.batch_scheduler = BatchScheduler(
+        granite.granite_generate_requests,
+        max_batch_size=args.batch_size,
+        max_wait_ms=args.wait_ms
+    ).start()
+    batched = run_load(args.requests, args.concurrency)
+    stats = granite.batch_scheduler.stats()
+    granite.batch_scheduler.stop()
+
+    print(f"Unbatched: {unbatched:8.2f} req/s")
+    print(f"Batched:   {batched:8.2f} req/s  (avg batch size {stats['avg_batch_size']:.1f})")
+    print(f"Speed-up:  {batched / unbatched:8.2f}x")
+
+    if stats['avg_batch_size'] <= 1:
+        print("FAIL: requests were not batched together")
+        sys.exit(1)
+    if batched <= unbatched:
+        print("FAIL: batching did not raise throughput")
+        sys.exit(1)
+    print("PASS: batched throughput beats one generate call per request")
+
+
+if __name__ == "__main__":
+    main()
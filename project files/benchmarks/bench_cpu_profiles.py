@@ -0,0 +1,99 @@
+"""
+Benchmark: tokens/sec and peak RSS for each CPU inference profile.
+
+Every profile runs in its own subprocess so peak resident memory is measured
+independently. Uses a tiny local model unless ``--model`` names a Hugging
+Face checkpoint (e.g. the Granite model used by ``app.py``).
+
+    python -m benchmarks.bench_cpu_profiles --profiles fp32 int8 bf16
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+import cpu_profiles
+
+PROMPT = "how do i pay my taxes and when is trash pickup"
+
+
+def load_model(model_name, profile):
+    import torch
+
+    if model_name is None:
+        from benchmarks.tiny_model import build_tiny_pair
+        tokenizer, model = build_tiny_pair(n_layer=4, n_embd=256, n_head=4)
+        dtype_name = cpu_profiles.PROFILES[profile][0]
+        model = cpu_profiles.optimize_cpu_model(model.to(getattr(torch, dtype_name)), profile)
+        return tokenizer, model
+
+    from transformers import AutoTokenizer
+    return AutoTokenizer.from_pretrained(model_name), cpu_profiles.load_cpu_model(model_name, profile)
+
+
+def run_profile(model_name, profile, new_tokens, repeat):
+    """Measure one profile in the current process and return its results"""
+    import torch
+
+    cpu_profiles.apply_thread_settings()
+    tokenizer, model = load_model(model_name, profile)
+    inputs = tokenizer(PROMPT, return_tensors="pt")
+    pad_token_id = tokenizer.pad_token_id if tokenizer.pad_token_id is not None else tokenizer.eos_token_id
+
+    def generate():
+        with torch.no_grad():
+            model.generate(
+                **inputs,
+                max_new_tokens=new_tokens,
+                min_new_tokens=new_tokens,
+                do_sample=False,
+                pad_token_id=pad_token_id
+            )
+
+    generate()  # warm-up (and compilation for compiled profiles)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        generate()
+    elapsed = time.perf_counter() - start
+
+    return {
+        'profile': profile,
+        'tokens_per_sec': round(new_tokens * repeat / elapsed, 2),
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'threads': torch.get_num_threads(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CitizenAI CPU profile benchmark")
+    parser.add_argument("--model", default=None, help="Hugging Face model id (default: tiny local model)")
+    parser.add_argument("--profiles", nargs="+", default=list(cpu_profiles.PROFILES),
+                        choices=list(cpu_profiles.PROFILES))
+    parser.add_argument("--new-tokens", type=int, default=32)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_profile(args.model, args.profiles[0], args.new_tokens, args.repeat)))
+        return
+
+    print(f"{'Profile':<16}{'tokens/sec':>12}{'peak RSS (MB)':>16}")
+    for profile in args.profiles:
+        command = [sys.executable, "-m", "benchmarks.bench_cpu_profiles", "--child",
+                   "--profiles", profile, "--new-tokens", str(args.new_tokens), "--repeat", str(args.repeat)]
+        if args.model:
+            command += ["--model", args.model]
+        result = subprocess.run(command, capture_output=True, text=True)
+        if result.returncode != 0:
+            print(f"{profile:<16}{'failed':>12}  {result.stderr.strip().splitlines()[-1:]}")
+            continue
+        stats = json.loads(result.stdout.strip().splitlines()[-1])
+        print(f"{profile:<16}{stats['tokens_per_sec']:>12.2f}{stats['peak_rss_mb']:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark: deadline-aware generation and cancellation with a tiny local model.
+
+Runs the same questions through ``granite.granite_generate_batch`` with no
+deadline, with a short deadline, with a cancellation fired mid-generation
+(what a client disconnect triggers) and with a backed-up inference queue,
+then prints latency, tokens generated and the tokens-saved counters.
+
+Exits with status 1 unless the deadline and cancelled runs stop with that
+reason and generate fewer tokens than the unbounded run, and the full
+queue trims the token budget.
+
+    python -m benchmarks.bench_deadlines --deadline-ms 20 --cancel-after-ms 10
+"""
+
+import argparse
+import sys
+import threading
+import time
+
+import granite
+from benchmarks.tiny_model import build_tiny_pair
+from deadlines import CANCELLED, DEADLINE, GenerationControl, GenerationSavings
+
+QUESTIONS = [
+    "how do i pay my taxes",
+    "when is trash pickup",
+    "how do i register to vote",
+    "report pothole on my street",
+]
+
+
+def run(label, controls, waiting=0):
+    """One batched generate call with ``waiting`` questions queued behind it.
+
+    Returns the longest answer in tokens and the tokens-saved counters.
+    """
+    granite.generation_savings = GenerationSavings()
+    # Hold every worker slot plus ``waiting`` queue slots, as concurrent requests would
+    releases = [granite.inference_queue.admit() for _ in range(granite.inference_queue.workers + waiting)]
+    try:
+        start = time.perf_counter()
+        responses = granite.granite_generate_batch(QUESTIONS, controls)
+        elapsed = time.perf_counter() - start
+    finally:
+        for release in releases:
+            release()
+
+    tokens = max(len(granite.tokenizer.encode(response)) for response in responses)
+    savings = granite.generation_savings.snapshot()
+    print(f"{label:<22}{elapsed * 1000:>10.1f} ms{tokens:>8} tokens   saved {savings['tokens_saved_total']:>5} "
+          f"(deadline {savings['stopped_by_deadline']}, cancelled {savings['cancelled']})")
+    return tokens, savings
+
+
+def check_stopped(label, controls, tokens, baseline, reason):
+    """Failure messages unless every control stopped for ``reason`` before the unbounded run's length"""
+    failures = []
+    reasons = sorted({str(control.stop_reason) for control in controls})
+    if reasons != [reason]:
+        failures.append(f"{label}: stop reasons {', '.join(reasons)}, expected {reason}")
+    if tokens >= baseline:
+        failures.append(f"{label}: generated {tokens} tokens, no fewer than the {baseline} without a deadline")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CitizenAI deadline/cancellation benchmark")
+    parser.add_argument("--max-new-tokens", type=int, default=150)
+    parser.add_argument("--deadline-ms", type=float, default=20.0)
+    parser.add_argument("--cancel-after-ms", type=float, default=10.0)
+    args = parser.parse_args()
+
+    granite.tokenizer, granite.model = build_tiny_pair(n_layer=4, n_embd=128)
+    granite.device = "cpu"
+    granite.prefix_cache = None
+    # Never stop at EOS, so every run uses its whole budget unless cut short
+    granite.model.generation_config.eos_token_id = None
+    granite.GENERATION_CONFIG = {**granite.GENERATION_CONFIG, 'max_new_tokens': args.max_new_tokens}
+    granite.granite_generate_batch(QUESTIONS[:1])
+
+    baseline, _ = run("no deadline", [GenerationControl() for _ in QUESTIONS])
+
+    failures = []
+    controls = [GenerationControl(args.deadline_ms / 1000) for _ in QUESTIONS]
+    tokens, _ = run("deadline", controls)
+    failures += check_stopped("deadline", controls, tokens, baseline, DEADLINE)
+
+    controls = [GenerationControl() for _ in QUESTIONS]
+    timer = threading.Timer(args.cancel_after_ms / 1000, lambda: [control.cancel() for control in controls])
+    timer.start()
+    tokens, _ = run("cancelled (disconnect)", controls)
+    timer.join()
+    failures += check_stopped("cancelled", controls, tokens, baseline, CANCELLED)
+
+    _, savings = run("queue full", [GenerationControl() for _ in QUESTIONS], waiting=granite.inference_queue.max_queue)
+    if not savings['tokens_trimmed_by_load']:
+        failures.append("queue full: the token budget was not trimmed")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print("PASS: deadlines and cancellation stopped generation early, and load trimmed the budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark: static pages rendered per hit vs. served from the page cache.
+
+Uses the demo app's test client. For each page it times a fresh
+``render_template`` per request (the old behaviour), a cached full
+response, and a revalidation that ends in ``304 Not Modified``, and reports
+the bytes sent for the identity, gzip and brotli variants of pages and CSS.
+
+    python -m benchmarks.bench_pages --requests 2000 -o pages.json
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.results import compare_results, save_results
+
+PAGES = {'/': 'index.html', '/about': 'about.html', '/services': 'services.html'}
+
+
+def per_request(fn, count):
+    """Average microseconds per call"""
+    start = time.perf_counter()
+    for _ in range(count):
+        fn()
+    return round((time.perf_counter() - start) / count * 1_000_000, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CitizenAI page cache benchmark")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("-o", "--output", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Previous results JSON to compare against")
+    args = parser.parse_args()
+
+    if 'CITIZENAI_DB_PATH' not in os.environ:
+        os.environ['CITIZENAI_DB_PATH'] = os.path.join(tempfile.mkdtemp(prefix='citizenai-bench-'), 'bench.db')
+    from flask import render_template
+
+    import app_demo
+
+    app = app_demo.app
+    client = app.test_client()
+    results = {}
+
+    for path, template in PAGES.items():
+        def render_every_time():
+            with app.test_request_context(path):
+                render_template(template)
+
+        first = client.get(path, headers={'Accept-Encoding': 'identity'})
+        etag = first.headers['ETag']
+        sizes = {'identity': len(first.data)}
+        for encoding in ('gzip', 'br'):
+            response = client.get(path, headers={'Accept-Encoding': encoding})
+            if response.headers.get('Content-Encoding') == encoding:
+                sizes[encoding] = len(response.data)
+
+        results[path] = {
+            'render_us': per_request(render_every_time, args.requests),
+            'cached_us': per_request(lambda: client.get(path, headers={'Accept-Encoding': 'gzip'}), args.requests),
+            'not_modified_us': per_request(lambda: client.get(path, headers={'If-None-Match': etag}), args.requests),
+            'bytes': sizes,
+        }
+
+    css_url = None
+    with app.test_request_context('/'):
+        from flask import url_for
+        css_url = url_for('static', filename='css/styles.css')
+    css = client.get(css_url, headers={'Accept-Encoding': 'identity'})
+    css_sizes = {'identity': len(css.data)}
+    for encoding in ('gzip', 'br'):
+        response = client.get(css_url, headers={'Accept-Encoding': encoding})
+        if response.headers.get('Content-Encoding') == encoding:
+            css_sizes[encoding] = len(response.data)
+    results['styles.css'] = {
+        'url': css_url,
+        'cache_control': css.headers.get('Cache-Control'),
+        'cached_us': per_request(lambda: client.get(css_url, headers={'Accept-Encoding': 'gzip'}), args.requests),
+        'bytes': css_sizes,
+    }
+
+    for name, result in results.items():
+        timings = "  ".join(f"{key[:-3]} {value:8.1f} µs" for key, value in result.items() if key.endswith('_us'))
+        sizes = ", ".join(f"{encoding} {size:,} B" for encoding, size in result['bytes'].items())
+        print(f"{name:<12}{timings}   [{sizes}]")
+
+    if args.output:
+        save_results(args.output, 'pages', {'requests': args.requests}, results)
+    if args.compare:
+        compare_results(args.compare, results, ('render_us', 'cached_us', 'not_modified_us'))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark: prompt prefill time with and without the system-prompt prefix cache.
+
+Times the forward pass that precedes decoding for every question, once over
+the full prompt and once over just the question tokens on top of a copy of
+the cached prefix. Uses a tiny local model unless ``--model`` names a
+Hugging Face checkpoint (e.g. the Granite model used by ``granite.py``).
+
+    python -m benchmarks.bench_prefix_cache --repeat 50
+"""
+
+import argparse
+import time
+
+import torch
+
+import granite
+from benchmarks.tiny_model import build_tiny_pair
+from prefix_cache import PrefixCache
+
+QUESTIONS = [
+    "how do i pay my taxes",
+    "when is trash pickup",
+    "how do i register to vote",
+    "report pothole on my street",
+]
+
+
+def load_pair(model_name):
+    if model_name is None:
+        return build_tiny_pair(n_layer=4, n_embd=128)
+    from transformers import AutoModelForCausalLM, AutoTokenizer
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForCausalLM.from_pretrained(model_name, torch_dtype=torch.float32)
+    model.eval()
+    return tokenizer, model
+
+
+def time_prefill(run, repeat):
+    """Average seconds per call of ``run`` over ``repeat`` iterations"""
+    run()  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        run()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CitizenAI prefix KV-cache benchmark")
+    parser.add_argument("--model", default=None, help="Hugging Face model id (default: tiny local model)")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    torch.set_grad_enabled(False)
+    tokenizer, model = load_pair(args.model)
+    cache = PrefixCache(model, tokenizer, granite.PROMPT_PREFIX, "cpu").prefill()
+
+    full_inputs = [tokenizer(granite.build_prompt(q), return_tensors="pt").input_ids for q in QUESTIONS]
+    suffix_inputs = [
+        tokenizer(granite.build_prompt_suffix(q), return_tensors="pt", add_special_tokens=False).input_ids
+        for q in QUESTIONS
+    ]
+
+    def without_cache():
+        for input_ids in full_inputs:
+            model(input_ids, use_cache=True)
+
+    def with_cache():
+        for input_ids in suffix_inputs:
+            model(input_ids, past_key_values=cache.copy_for_batch(1), use_cache=True)
+
+    baseline = time_prefill(without_cache, args.repeat) / len(QUESTIONS)
+    cached = time_prefill(with_cache, args.repeat) / len(QUESTIONS)
+
+    print(f"Prefix length:         {cache.prefix_length} tokens")
+    print(f"Prefill without cache: {baseline * 1000:8.3f} ms / request")
+    print(f"Prefill with cache:    {cached * 1000:8.3f} ms / request")
+    print(f"Speed-up:              {baseline / cached:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
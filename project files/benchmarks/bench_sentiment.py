@@ -0,0 +1,59 @@
+"""
+Benchmark: sentiment throughput of the shared engine vs. the old keyword scan.
+
+    python -m benchmarks.bench_sentiment --texts 200000
+"""
+
+import argparse
+import random
+import time
+
+from sentiment import NEGATIVE_WORDS, POSITIVE_WORDS, analyze_sentiment, analyze_sentiment_batch
+
+FILLER = (
+    "the permit office on main street took my application and the staff said "
+    "it would be processed after the review of my documents next week"
+).split()
+
+
+def legacy_analyze_sentiment(text):
+    """The original per-call substring scan, kept for comparison"""
+    text_lower = text.lower()
+    positive_words = list(POSITIVE_WORDS)
+    negative_words = list(NEGATIVE_WORDS)
+    positive_score = sum(1 for word in positive_words if word in text_lower)
+    negative_score = sum(1 for word in negative_words if word in text_lower)
+    if positive_score > negative_score:
+        return 'Positive'
+    elif negative_score > positive_score:
+        return 'Negative'
+    return 'Neutral'
+
+
+def make_texts(count, seed=0):
+    rng = random.Random(seed)
+    vocabulary = FILLER + list(POSITIVE_WORDS) + list(NEGATIVE_WORDS) + ['not', "wasn't"]
+    return [" ".join(rng.choices(vocabulary, k=rng.randint(8, 40))) for _ in range(count)]
+
+
+def measure(name, fn, texts):
+    start = time.perf_counter()
+    fn(texts)
+    elapsed = time.perf_counter() - start
+    rate = len(texts) / elapsed
+    print(f"{name:<24}{rate:>14,.0f} texts/s{1_000_000 / rate:>12.2f} s per million")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CitizenAI sentiment benchmark")
+    parser.add_argument("--texts", type=int, default=200_000)
+    args = parser.parse_args()
+
+    texts = make_texts(args.texts)
+    measure("legacy substring scan", lambda items: [legacy_analyze_sentiment(t) for t in items], texts)
+    measure("analyze_sentiment", lambda items: [analyze_sentiment(t) for t in items], texts)
+    measure("analyze_sentiment_batch", analyze_sentiment_batch, texts)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Benchmark: speculative decoding with two tiny local models.
+
+Builds a larger tiny GPT-2 as the main model and times single-question
+``granite.granite_generate_batch`` calls three ways: plain decoding, with a
+draft made of the main model's first layers, and with an unrelated random
+draft. Decoding is greedy so every mode produces the same tokens. The
+models have untied output heads; with tied ones every random model just
+repeats its last token and any two of them agree.
+
+A random model's first layers predict nothing like the full stack, so the
+main model's deeper blocks are damped (``--refine-scale``) to only refine
+what the first ones produce, the way a distilled draft tracks its teacher.
+That draft then shares most of the main model's predictions, which is the
+case speculative decoding is for.
+
+Exits with status 1 unless the layer draft stays active with an acceptance
+rate at least twice the unrelated draft's, and the unrelated draft
+triggers the fallback to plain decoding.
+
+    python -m benchmarks.bench_speculative --target-layers 12 --draft-layers 1
+"""
+
+import argparse
+import copy
+import sys
+import time
+
+import granite
+from benchmarks.tiny_model import build_tiny_model, build_tiny_pair
+from speculative import SpeculativeDecoder
+
+QUESTIONS = [
+    "how do i pay my taxes",
+    "when is trash pickup",
+    "how do i register to vote",
+    "report pothole on my street",
+]
+
+
+def build_layer_draft(target, n_layer):
+    """Draft sharing the target's embeddings and first ``n_layer`` blocks"""
+    from transformers import GPT2LMHeadModel
+
+    config = copy.deepcopy(target.config)
+    config.n_layer = n_layer
+    draft = GPT2LMHeadModel(config)
+    draft.load_state_dict(target.state_dict(), strict=False)
+    draft.eval()
+    return draft
+
+
+def damp_deep_layers(model, keep, scale):
+    """Scale the residual output of every block after the first ``keep`` by ``scale``"""
+    import torch
+
+    with torch.no_grad():
+        for block in model.transformer.h[keep:]:
+            for projection in (block.attn.c_proj, block.mlp.c_proj):
+                projection.weight.mul_(scale)
+                projection.bias.mul_(scale)
+
+
+def run(label, repeats):
+    """Answer every question ``repeats`` times one at a time; returns tokens per second"""
+    tokens = 0
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for question in QUESTIONS:
+            response = granite.granite_generate_batch([question])[0]
+            tokens += len(granite.tokenizer.encode(response))
+    elapsed = time.perf_counter() - start
+    rate = tokens / elapsed
+    line = f"{label:<24}{elapsed * 1000:>10.1f} ms{rate:>10.1f} tok/s"
+    if granite.speculative_decoder is not None:
+        stats = granite.speculative_decoder.stats()
+        line += (f"   acceptance {stats['acceptance_rate']:.0%}, fallbacks {stats['fallbacks']}, "
+                 f"speculative calls {stats['modes']['speculative']['calls']}")
+    print(line)
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CitizenAI speculative decoding benchmark")
+    parser.add_argument("--target-layers", type=int, default=12)
+    parser.add_argument("--draft-layers", type=int, default=1)
+    parser.add_argument("--n-embd", type=int, default=512)
+    parser.add_argument("--n-head", type=int, default=8)
+    parser.add_argument("--draft-tokens", type=int, default=4)
+    parser.add_argument("--max-new-tokens", type=int, default=64)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--min-acceptance", type=float, default=0.35)
+    parser.add_argument("--refine-scale", type=float, default=0.05,
+                        help="Output scale of the main model's blocks beyond the draft's (1 leaves them random)")
+    args = parser.parse_args()
+
+    granite.tokenizer, granite.model = build_tiny_pair(n_layer=args.target_layers, n_embd=args.n_embd,
+                                                       n_head=args.n_head, tie_embeddings=False)
+    damp_deep_layers(granite.model, args.draft_layers, args.refine_scale)
+    granite.device = "cpu"
+    granite.prefix_cache = None
+    # Never stop at EOS so every mode generates the full budget; greedy so outputs match
+    granite.model.generation_config.eos_token_id = None
+    granite.GENERATION_CONFIG = {'max_new_tokens': args.max_new_tokens, 'do_sample': False}
+
+    layer_label = f"first {args.draft_layers} layer(s) draft"
+    drafts = {
+        layer_label: build_layer_draft(granite.model, args.draft_layers),
+        "unrelated draft": build_tiny_model(len(granite.tokenizer), n_layer=args.draft_layers, n_embd=args.n_embd,
+                                            n_head=args.n_head, seed=1, tie_embeddings=False),
+    }
+    for draft in drafts.values():
+        draft.generation_config.eos_token_id = None
+
+    granite.speculative_decoder = None
+    granite.granite_generate_batch(QUESTIONS[:1])
+    baseline = run("plain decoding", args.repeats)
+
+    stats = {}
+    for label, draft in drafts.items():
+        granite.speculative_decoder = SpeculativeDecoder(
+            granite.model, draft,
+            draft_tokens=args.draft_tokens,
+            min_acceptance=args.min_acceptance,
+            window=len(QUESTIONS)
+        )
+        rate = run(label, args.repeats)
+        print(f"{'':<24}speedup {rate / baseline:.2f}x")
+        stats[label] = granite.speculative_decoder.stats()
+        granite.speculative_decoder.close()
+
+    layer, unrelated = stats[layer_label], stats["unrelated draft"]
+    failures = []
+    if layer['fallbacks'] or not layer['active']:
+        failures.append(f"the layer draft fell back to plain decoding (acceptance {layer['acceptance_rate']:.0%})")
+    if layer['acceptance_rate'] < 2 * unrelated['acceptance_rate']:
+        failures.append(f"layer draft acceptance {layer['acceptance_rate']:.0%} is not clearly above "
+                        f"the unrelated draft's {unrelated['acceptance_rate']:.0%}")
+    if unrelated['fallbacks'] == 0:
+        failures.append("the unrelated draft never triggered the fallback to plain decoding")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print(f"PASS: layer draft stayed active at {layer['acceptance_rate']:.0%} acceptance, "
+          f"unrelated draft ({unrelated['acceptance_rate']:.0%}) fell back")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Load test: drive the Flask routes with concurrent clients and report latency
+percentiles and throughput per route.
+
+The app is built by the same ``webapp.create_app`` factory production uses.
+By default the responder is the stub with configurable latency, so the
+numbers isolate the web hot path (routing, sessions, inference queue,
+sentiment, storage, template rendering). ``--mode client`` uses the in-process Flask test
+client; ``--mode server`` starts a real threaded WSGI server on a local port
+and goes through HTTP.
+
+    python -m benchmarks.load_test --mode server --concurrency 16 --requests 400 --latency-ms 50 -o load.json
+    python -m benchmarks.load_test --responder demo --compare load.json
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.cookiejar import CookieJar
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+from urllib.request import HTTPCookieProcessor, build_opener
+
+from benchmarks.results import compare_results, latency_summary, save_results
+from responders import RESPONDERS
+
+LOGIN = {'username': 'admin', 'password': 'password'}
+
+# route name -> (method, path, form field, sample payloads)
+ROUTES = {
+    'ask': ('POST', '/ask', 'question', [
+        "how do i pay my taxes",
+        "what documents do i need to renew my passport",
+        "when is trash pickup on my street",
+        "can you explain the new zoning rules for my neighbourhood",
+    ]),
+    'feedback': ('POST', '/feedback', 'feedback', [
+        "The new portal is great and very helpful",
+        "Terrible wait times, the office was not helpful at all",
+        "I submitted the form yesterday",
+    ]),
+    'concern': ('POST', '/concern', 'concern', [
+        "Streetlight out on Maple Avenue for a week",
+        "Overflowing bins near the park entrance",
+    ]),
+    'dashboard': ('GET', '/dashboard', None, [None]),
+}
+
+
+def build_app(responder_name, latency_ms, jitter_ms, intents):
+    """The production app with the chosen responder and a throwaway database"""
+    from responders import StubResponder, create_responder
+    from webapp import create_app
+
+    if 'CITIZENAI_DB_PATH' not in os.environ:
+        os.environ['CITIZENAI_DB_PATH'] = os.path.join(tempfile.mkdtemp(prefix='citizenai-bench-'), 'bench.db')
+    if responder_name == 'stub':
+        responder = StubResponder(latency_ms, jitter_ms)
+    else:
+        responder = create_responder(responder_name)
+    responder.start()
+    return create_app(responder, intents=intents)
+
+
+class TestClientSession:
+    """One logged-in Flask test client per worker thread"""
+
+    def __init__(self, flask_app):
+        self.client = flask_app.test_client()
+        self.client.post('/login', data=LOGIN)
+
+    def request(self, method, path, data):
+        response = self.client.open(path, method=method, data=data)
+        response.get_data()
+        return response.status_code
+
+
+class HTTPSession:
+    """One logged-in urllib opener (own cookie jar) per worker thread"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.opener = build_opener(HTTPCookieProcessor(CookieJar()))
+        self.request('POST', '/login', LOGIN)
+
+    def request(self, method, path, data):
+        body = urlencode(data).encode() if data is not None else None
+        try:
+            with self.opener.open(self.base_url + path, data=body if method == 'POST' else None) as response:
+                response.read()
+                return response.status
+        except HTTPError as e:
+            # urllib raises on 4xx/5xx; report the status like the test client does
+            with e:
+                e.read()
+            return e.code
+
+
+def start_server(flask_app):
+    """Serve ``flask_app`` on an ephemeral local port; returns (server, base_url)"""
+    from werkzeug.serving import make_server
+
+    server = make_server('127.0.0.1', 0, flask_app, threaded=True)
+    threading.Thread(target=server.serve_forever, name="citizenai-bench-server", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def run_route(name, session_factory, total_requests, concurrency):
+    """Send ``total_requests`` to one route from ``concurrency`` threads"""
+    method, path, field, payloads = ROUTES[name]
+    local = threading.local()
+    errors = []
+    shed = []
+
+    def one(index):
+        session = getattr(local, 'session', None)
+        if session is None:
+            session = local.session = session_factory()
+        payload = payloads[index % len(payloads)]
+        data = {field: payload} if field else None
+        start = time.perf_counter()
+        status = session.request(method, path, data)
+        elapsed = time.perf_counter() - start
+        if status == 503:
+            # Turned away by the full inference queue
+            shed.append(status)
+        elif status >= 400:
+            errors.append(status)
+        return elapsed
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(one, range(total_requests)))
+    summary = latency_summary(latencies, time.perf_counter() - start)
+    summary['errors'] = len(errors)
+    summary['shed'] = len(shed)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CitizenAI route load test")
+    parser.add_argument("--responder", choices=RESPONDERS, default='stub')
+    parser.add_argument("--mode", choices=['client', 'server'], default='client')
+    parser.add_argument("--routes", default=','.join(ROUTES), help="Comma-separated subset of: " + ', '.join(ROUTES))
+    parser.add_argument("--requests", type=int, default=200, help="Requests per route")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Stub responder latency per answer")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--no-intents", action='store_true', help="Disable the intent fast-path so every /ask reaches the responder")
+    parser.add_argument("-o", "--output", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Previous results JSON to compare against")
+    args = parser.parse_args()
+
+    routes = [name.strip() for name in args.routes.split(',') if name.strip()]
+    unknown = set(routes) - set(ROUTES)
+    if unknown:
+        raise SystemExit(f"Unknown routes: {', '.join(sorted(unknown))}")
+
+    flask_app = build_app(args.responder, args.latency_ms, args.jitter_ms, not args.no_intents)
+    server = None
+    if args.mode == 'server':
+        server, base_url = start_server(flask_app)
+        session_factory = lambda: HTTPSession(base_url)
+    else:
+        session_factory = lambda: TestClientSession(flask_app)
+
+    results = {}
+    try:
+        for name in routes:
+            results[name] = summary = run_route(name, session_factory, args.requests, args.concurrency)
+            print(f"{name:<10} {summary['requests_per_sec']:9.1f} req/s  p50 {summary['p50_ms']:8.2f} ms  "
+                  f"p95 {summary['p95_ms']:8.2f} ms  p99 {summary['p99_ms']:8.2f} ms  "
+                  f"shed {summary['shed']}  errors {summary['errors']}")
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    config = {key: value for key, value in vars(args).items() if key not in ('output', 'compare')}
+    if args.output:
+        save_results(args.output, 'load_test', config, results)
+    if args.compare:
+        compare_results(args.compare, results, ('requests_per_sec', 'p50_ms', 'p99_ms'))
+
+
+if __name__ == "__main__":
+    main()
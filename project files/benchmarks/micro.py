@@ -0,0 +1,159 @@
+"""
+Micro-benchmarks for the per-request hot functions: sentiment analysis, the
+demo responder and Jinja template rendering.
+
+Each case is timed with ``timeit`` (best of ``--repeat`` runs) and reported
+in microseconds per call. Before timing, the intent router is checked
+against a table of canonical questions and the script exits 1 if any of
+them routes differently, so tuning ``intents.json`` can't silently turn
+the fast-path off (or on for questions the model should answer).
+
+    python -m benchmarks.micro -o micro.json
+    python -m benchmarks.micro --compare micro.json
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import timeit
+
+from benchmarks.bench_sentiment import make_texts
+from benchmarks.results import compare_results, save_results
+
+QUESTIONS = [
+    "how do i pay my taxes",
+    "where can i renew my driver's license",
+    "can you explain the new zoning rules for my neighbourhood",
+]
+
+# Canonical question -> intent the router must answer it with (None: leave it to the model)
+INTENT_CASES = [
+    ("How do I pay my property taxes?", 'taxes'),
+    ("how do i pay my taxes", 'taxes'),
+    ("tax filing deadlines for small businesses", 'taxes'),
+    ("When are taxes due?", 'taxes'),
+    ("How do I get a building permit for my house?", 'licenses'),
+    ("where can i renew my driver's license", 'licenses'),
+    ("How do I apply for a business license?", 'licenses'),
+    ("where do i vote", 'voting'),
+    ("How do I register to vote?", 'voting'),
+    ("Where is my polling place for the election?", 'voting'),
+    ("water leak in my basement", 'utilities'),
+    ("How do I pay my water bill?", 'utilities'),
+    ("park near downtown with tennis courts", 'parks'),
+    ("What recreation programs do you offer?", 'parks'),
+    ("What is the non-emergency police number?", 'police'),
+    ("When is trash pickup?", 'trash'),
+    ("What day is recycling collected?", 'trash'),
+    ("How do I report a pothole?", 'roads'),
+    ("Is Main Street closed for construction?", 'roads'),
+    ("hello", 'greeting'),
+    ("Hi there", 'greeting'),
+    ("My street light is broken, who fixes it?", None),
+    ("I need help", None),
+    ("can you explain the new zoning rules for my neighbourhood", None),
+    ("Is my water bill going up because of the new road construction?", None),
+    ("Who do I call about a noise complaint from my neighbor's party?", None),
+]
+
+RECENT_CONCERNS = [
+    {'id': i, 'timestamp': '2024-01-01 12:00:00', 'text': f"Streetlight {i} is out", 'status': 'Open'}
+    for i in range(10)
+]
+
+
+def time_call(fn, number, repeat):
+    """Best-of-``repeat`` time per call in microseconds"""
+    best = min(timeit.repeat(fn, number=number, repeat=repeat))
+    return round(best / number * 1_000_000, 3)
+
+
+def check_intents(router):
+    """``(question, expected, got)`` for every canonical question routed differently"""
+    failures = []
+    for question, expected in INTENT_CASES:
+        match, _ = router.match(question)
+        got = match.intent if match is not None else None
+        if got != expected:
+            failures.append((question, expected, got))
+    return failures
+
+
+def build_cases(texts):
+    """Name -> zero-argument callable for every micro-benchmark"""
+    from flask import render_template
+
+    import app_demo
+    from sentiment import analyze_sentiment, analyze_sentiment_batch
+
+    short_text, long_text = min(texts, key=len), max(texts, key=len)
+    questions = iter(QUESTIONS * 1_000_000)
+    demo = app_demo.app.extensions['citizenai']
+
+    def demo_answer():
+        # What /ask does before storage: intent fast-path, then the demo responder
+        question = next(questions)
+        match = demo['intent_router'].route(question)
+        return match.response if match is not None else demo['responder'].answer(question)
+
+    def render(template, **context):
+        def call():
+            with app_demo.app.test_request_context():
+                render_template(template, **context)
+        return call
+
+    return {
+        'sentiment_short': lambda: analyze_sentiment(short_text),
+        'sentiment_long': lambda: analyze_sentiment(long_text),
+        'sentiment_batch_100': lambda: analyze_sentiment_batch(texts[:100]),
+        'demo_answer': demo_answer,
+        'render_chat_answer': render('chat.html', question_response=QUESTIONS[0] * 5, user_question=QUESTIONS[0]),
+        'render_dashboard': render('dashboard.html',
+                                   sentiment_data={'positive': 120, 'neutral': 80, 'negative': 40},
+                                   recent_concerns=RECENT_CONCERNS, total_interactions=500,
+                                   total_concerns=60, open_concerns=12),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CitizenAI hot-function micro-benchmarks")
+    parser.add_argument("--number", type=int, default=2000, help="Calls per timing run")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", help="Comma-separated subset of cases to run")
+    parser.add_argument("-o", "--output", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Previous results JSON to compare against")
+    args = parser.parse_args()
+
+    from intent_router import IntentRouter
+
+    failures = check_intents(IntentRouter.from_file())
+    for question, expected, got in failures:
+        print(f"intent mismatch: {question!r} -> {got} (expected {expected})")
+    print(f"intent routing: {len(INTENT_CASES) - len(failures)}/{len(INTENT_CASES)} canonical questions OK")
+    if failures:
+        sys.exit(1)
+
+    if 'CITIZENAI_DB_PATH' not in os.environ:
+        os.environ['CITIZENAI_DB_PATH'] = os.path.join(tempfile.mkdtemp(prefix='citizenai-bench-'), 'bench.db')
+
+    cases = build_cases(make_texts(1000))
+    if args.only:
+        wanted = {name.strip() for name in args.only.split(',')}
+        cases = {name: fn for name, fn in cases.items() if name in wanted}
+
+    results = {}
+    for name, fn in cases.items():
+        number = max(1, args.number // 100) if name.startswith('render_') or name.endswith('_100') else args.number
+        results[name] = {'us_per_call': time_call(fn, number, args.repeat), 'number': number}
+        print(f"{name:<26}{results[name]['us_per_call']:>12.2f} µs/call")
+
+    config = {'number': args.number, 'repeat': args.repeat}
+    if args.output:
+        save_results(args.output, 'micro', config, results)
+    if args.compare:
+        compare_results(args.compare, results, ('us_per_call',))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Shared helpers for benchmark statistics and JSON result files.
+"""
+
+import json
+import math
+import os
+import platform
+import subprocess
+import time
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def latency_summary(latencies, elapsed):
+    """p50/p95/p99 (ms) and throughput for a list of per-request latencies in seconds"""
+    ordered = sorted(latencies)
+    return {
+        'requests': len(ordered),
+        'requests_per_sec': round(len(ordered) / elapsed, 2) if elapsed else 0.0,
+        'p50_ms': round(percentile(ordered, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(ordered, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(ordered, 0.99) * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3) if ordered else 0.0,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save_results(path, kind, config, results):
+    """Write results as JSON with enough metadata to compare runs between commits"""
+    document = {
+        'kind': kind,
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'cpu_count': os.cpu_count(),
+        'config': config,
+        'results': results,
+    }
+    with open(path, 'w', encoding='utf-8') as handle:
+        json.dump(document, handle, indent=2)
+    print(f"Results written to {path}")
+
+
+def compare_results(baseline_path, results, metrics):
+    """Print the relative change of ``metrics`` against a previous result file"""
+    with open(baseline_path, encoding='utf-8') as handle:
+        baseline = json.load(handle)
+    print(f"\nCompared with {baseline_path} (commit {baseline.get('commit')}):")
+    for name, current in results.items():
+        previous = baseline['results'].get(name)
+        if previous is None:
+            continue
+        changes = []
+        for metric in metrics:
+            if metric in current and previous.get(metric):
+                change = (current[metric] - previous[metric]) / previous[metric] * 100
+                changes.append(f"{metric} {change:+.1f}%")
+        print(f"  {name:<24}" + ", ".join(changes))
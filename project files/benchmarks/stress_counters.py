@@ -0,0 +1,104 @@
+"""
+Stress check: sharded sentiment counters stay exact across threads and processes.
+
+Starts several processes, each with many threads hammering a ShardedCounter
+backed by one shared SQLite store, then verifies the merged totals equal
+the number of increments made. Also compares hot-path throughput with a
+single lock-protected dict.
+
+    python -m benchmarks.stress_counters --processes 4 --threads 8 --increments 50000
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from counters import ShardedCounter
+from storage import SENTIMENT_KEYS, Store
+
+
+def hammer(increment, threads, increments):
+    """Run ``increments`` calls of ``increment`` in each of ``threads`` threads; return seconds"""
+    def work(offset):
+        for i in range(increments):
+            increment(SENTIMENT_KEYS[(i + offset) % 3])
+
+    workers = [threading.Thread(target=work, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return time.perf_counter() - start
+
+
+def process_main(db_path, threads, increments, results):
+    store = Store(db_path)
+    counter = ShardedCounter(SENTIMENT_KEYS, sink=store.add_sentiment_counts,
+                             source=store.sentiment_counts, flush_interval=0.05)
+    elapsed = hammer(counter.increment, threads, increments)
+    counter.close()
+    store.close()
+    results.put(elapsed)
+
+
+def locked_process_main(threads, increments, results):
+    """Baseline: the same load against one dict guarded by a lock"""
+    counts = dict.fromkeys(SENTIMENT_KEYS, 0)
+    lock = threading.Lock()
+
+    def increment(key):
+        with lock:
+            counts[key] += 1
+
+    results.put(hammer(increment, threads, increments))
+
+
+def run_processes(target, args, count):
+    """Run ``count`` copies of ``target`` concurrently and return their timings"""
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=target, args=args + (results,)) for _ in range(count)]
+    for process in processes:
+        process.start()
+    timings = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CitizenAI sharded counter stress check")
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--increments", type=int, default=50_000)
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix="citizenai-counters-"), "counters.db")
+    Store(db_path).close()  # create the schema before the workers race for it
+
+    timings = run_processes(process_main, (db_path, args.threads, args.increments), args.processes)
+    baseline = run_processes(locked_process_main, (args.threads, args.increments), args.processes)
+
+    reader = Store(db_path)
+    totals = reader.sentiment_counts()
+    reader.close()
+
+    expected = args.processes * args.threads * args.increments
+    total = sum(totals.values())
+    per_process = args.threads * args.increments
+    print(f"Totals:   {totals} (sum {total:,}, expected {expected:,})")
+    print(f"Sharded:  {per_process / max(timings):>14,.0f} increments/s per process")
+    print(f"Locked:   {per_process / max(baseline):>14,.0f} increments/s per process (single dict + lock)")
+
+    if total != expected:
+        print("FAIL: counts were lost or duplicated")
+        sys.exit(1)
+    print("PASS: counts are exact")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Tiny locally-built causal LM and tokenizer for offline benchmarks.
+
+Nothing is downloaded: the model is a randomly initialised two-layer GPT-2
+and the tokenizer is a whitespace word-level vocabulary built in memory.
+"""
+
+import torch
+from tokenizers import Tokenizer, models, normalizers, pre_tokenizers
+from transformers import GPT2Config, GPT2LMHeadModel, PreTrainedTokenizerFast
+
+SPECIAL_TOKENS = ["[PAD]", "[UNK]", "[EOS]"]
+
+BASE_WORDS = (
+    "you are a helpful ai assistant for government citizen engagement platform "
+    "provide clear accurate and information about services policies civic processes "
+    "question answer how do i pay my taxes apply for permit register to vote "
+    "when is trash pickup report pothole water outage park hours police "
+    "the of in on at is it what where can please thank"
+).split()
+
+
+def build_tiny_tokenizer(words=BASE_WORDS):
+    """Build a word-level fast tokenizer over ``words``."""
+    vocab = {token: i for i, token in enumerate(SPECIAL_TOKENS)}
+    for word in words:
+        vocab.setdefault(word.lower(), len(vocab))
+
+    backend = Tokenizer(models.WordLevel(vocab=vocab, unk_token="[UNK]"))
+    backend.normalizer = normalizers.Lowercase()
+    backend.pre_tokenizer = pre_tokenizers.Whitespace()
+
+    tokenizer = PreTrainedTokenizerFast(
+        tokenizer_object=backend,
+        pad_token="[PAD]",
+        unk_token="[UNK]",
+        eos_token="[EOS]",
+    )
+    tokenizer.padding_side = "left"
+    return tokenizer
+
+
+def build_tiny_model(vocab_size, n_layer=2, n_embd=64, n_head=2, seed=0, tie_embeddings=True):
+    """Build a randomly initialised GPT-2 model small enough for CPU tests.
+
+    With tied embeddings a random model mostly repeats its last input token,
+    since that token's embedding scores highest against itself; untied, the
+    output head is a random map of its own, so differently seeded models
+    produce different text.
+    """
+    torch.manual_seed(seed)
+    config = GPT2Config(
+        vocab_size=vocab_size,
+        n_positions=512,
+        n_embd=n_embd,
+        n_layer=n_layer,
+        n_head=n_head,
+        bos_token_id=2,
+        eos_token_id=2,
+        pad_token_id=0,
+        tie_word_embeddings=tie_embeddings,
+    )
+    model = GPT2LMHeadModel(config)
+    model.eval()
+    return model
+
+
+def build_tiny_pair(seed=0, **model_kwargs):
+    """Return a matching ``(tokenizer, model)`` pair."""
+    tokenizer = build_tiny_tokenizer()
+    model = build_tiny_model(len(tokenizer), seed=seed, **model_kwargs)
+    return tokenizer, model
@@ -0,0 +1,272 @@
+"""
+CitizenAI Concern Index
+
+Full-text search and near-duplicate clustering for citizen concerns. An
+inverted index maps each word to the concerns containing it, so a search
+only touches the postings of its rarest term. Each concern also gets a
+MinHash signature; locality-sensitive hashing over bands of the signature
+finds earlier reports that are probably near-duplicates without comparing
+against every concern, and a new report joins the cluster of its closest
+match. Hashing is deterministic, so processes indexing the same concerns
+arrive at the same clusters.
+
+Memory is bounded: the index covers only the most recent ``max_docs``
+concerns. The oldest is dropped as each new one arrives, and a new process
+reads only that many concerns from the database.
+"""
+
+import heapq
+import re
+import threading
+import zlib
+from collections import deque
+
+from response_cache import STOPWORDS
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+# 64 permutations in 16 bands of 4 rows: pairs above ~50% similarity almost
+# always share a band, pairs below ~20% almost never do
+NUM_PERMUTATIONS = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+SIMILARITY_THRESHOLD = 0.5
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+def _permutations(count, seed=20240101):
+    """Fixed (a, b) pairs for the universal hash family used by MinHash"""
+    state = seed
+    pairs = []
+    for _ in range(count):
+        state = (state * 6364136223846793005 + 1442695040888963407) % (1 << 64)
+        a = (state >> 3) % (_MERSENNE_PRIME - 1) + 1
+        state = (state * 6364136223846793005 + 1442695040888963407) % (1 << 64)
+        b = (state >> 3) % _MERSENNE_PRIME
+        pairs.append((a, b))
+    return pairs
+
+
+PERMUTATIONS = _permutations(NUM_PERMUTATIONS)
+
+
+def tokenize(text):
+    """Lowercased words without stopwords"""
+    return [word for word in _WORD.findall(text.lower()) if word not in STOPWORDS]
+
+
+def shingles(words):
+    """Words plus adjacent word pairs, so both vocabulary and phrasing count"""
+    items = set(words)
+    items.update(f"{first} {second}" for first, second in zip(words, words[1:]))
+    return items
+
+
+def minhash(items):
+    """MinHash signature of a set of strings"""
+    hashes = [zlib.crc32(item.encode('utf-8')) for item in items]
+    if not hashes:
+        return (_MAX_HASH,) * NUM_PERMUTATIONS
+    return tuple(
+        min(((a * value + b) % _MERSENNE_PRIME) & _MAX_HASH for value in hashes)
+        for a, b in PERMUTATIONS
+    )
+
+
+def similarity(first, second):
+    """Estimated Jaccard similarity of two signatures"""
+    return sum(1 for x, y in zip(first, second) if x == y) / NUM_PERMUTATIONS
+
+
+class ConcernIndex:
+    """Incrementally maintained search index and near-duplicate clusters.
+
+    Concerns are the entry dicts handed out by ``Store``; the index keeps its
+    own document numbers because entries only get a database ``id`` once the
+    store has flushed them. Document numbers only grow, so the oldest
+    document is always at the front of every list it appears in.
+    """
+
+    def __init__(self, threshold=SIMILARITY_THRESHOLD, max_docs=50000):
+        self.threshold = threshold
+        self.max_docs = max_docs
+        self._lock = threading.Lock()
+        self._next_doc = 0
+        self._docs = {}            # doc number -> concern entry
+        self._postings = {}        # word -> ascending doc numbers
+        self._signatures = {}      # doc number -> MinHash signature
+        self._buckets = {}         # (band, band values) -> ascending doc numbers
+        self._cluster_of = {}      # doc number -> cluster id (doc number of its first report)
+        self._clusters = {}        # cluster id -> ascending doc numbers
+        self._doc_of_id = {}       # database id -> doc number
+        self._unflushed = []       # indexed entries still waiting for their database id
+        self._last_db_id = 0
+
+    # Indexing
+
+    def add(self, entry):
+        """Index one concern; returns its cluster as ``{'cluster_id', 'size'}``.
+
+        A concern already indexed under its database id (e.g. read by
+        ``catch_up`` right after the store flushed it) is not indexed twice.
+        """
+        words = tokenize(entry['text'])
+        signature = minhash(shingles(words))
+        with self._lock:
+            self._claim_flushed()
+            doc = self._doc_of_id.get(entry.get('id'))
+            if doc is not None:
+                cluster_id = self._cluster_of[doc]
+                return {'cluster_id': cluster_id, 'size': len(self._clusters[cluster_id])}
+
+            doc = self._next_doc
+            self._next_doc += 1
+            self._docs[doc] = entry
+            self._signatures[doc] = signature
+            for word in set(words):
+                self._postings.setdefault(word, deque()).append(doc)
+
+            cluster_id = self._closest_cluster(signature)
+            if cluster_id is None:
+                cluster_id = doc
+            self._cluster_of[doc] = cluster_id
+            self._clusters.setdefault(cluster_id, deque()).append(doc)
+
+            for band, key in enumerate(self._band_keys(signature)):
+                self._buckets.setdefault((band, key), deque()).append(doc)
+
+            if entry.get('id') is None:
+                self._unflushed.append(doc)
+            else:
+                self._doc_of_id[entry['id']] = doc
+
+            while len(self._docs) > self.max_docs:
+                self._evict_oldest()
+            return {'cluster_id': cluster_id, 'size': len(self._clusters[cluster_id])}
+
+    def catch_up(self, store):
+        """Index concerns written by other processes since the last call (at most ``max_docs``)"""
+        with self._lock:
+            after = self._last_db_id
+        # Anything older than the newest max_docs would be evicted right away
+        rows = store.concerns_after(after, limit=self.max_docs, newest=True)
+        for entry in rows:
+            self.add(entry)
+        if rows:
+            with self._lock:
+                self._last_db_id = max(self._last_db_id, rows[-1]['id'])
+
+    def _claim_flushed(self):
+        """Key our own concerns that the store has flushed since by their new database id"""
+        waiting = []
+        for doc in self._unflushed:
+            concern_id = self._docs[doc].get('id')
+            if concern_id is None:
+                waiting.append(doc)
+            else:
+                self._doc_of_id[concern_id] = doc
+        self._unflushed = waiting
+
+    def _evict_oldest(self):
+        # Doc numbers are contiguous, so the oldest follows from the count
+        doc = self._next_doc - len(self._docs)
+        entry = self._docs.pop(doc)
+        signature = self._signatures.pop(doc)
+        for word in set(tokenize(entry['text'])):
+            self._pop_front(self._postings, word, doc)
+        for band, key in enumerate(self._band_keys(signature)):
+            self._pop_front(self._buckets, (band, key), doc)
+        self._pop_front(self._clusters, self._cluster_of.pop(doc), doc)
+        if entry.get('id') is not None:
+            self._doc_of_id.pop(entry['id'], None)
+        elif doc in self._unflushed:
+            self._unflushed.remove(doc)
+
+    @staticmethod
+    def _pop_front(lists, key, doc):
+        docs = lists[key]
+        if docs and docs[0] == doc:
+            docs.popleft()
+        if not docs:
+            del lists[key]
+
+    def _band_keys(self, signature):
+        return [signature[i:i + ROWS_PER_BAND] for i in range(0, NUM_PERMUTATIONS, ROWS_PER_BAND)]
+
+    def _closest_cluster(self, signature):
+        """Cluster of the most similar earlier concern sharing an LSH band, if similar enough"""
+        candidates = set()
+        for band, key in enumerate(self._band_keys(signature)):
+            candidates.update(self._buckets.get((band, key), ()))
+        best, best_score = None, self.threshold
+        for doc in candidates:
+            score = similarity(signature, self._signatures[doc])
+            if score >= best_score:
+                best, best_score = doc, score
+        return self._cluster_of[best] if best is not None else None
+
+    # Queries
+
+    def search(self, query, limit=20, status=None):
+        """Concerns containing every query word, newest first, plus the total match count"""
+        words = set(tokenize(query))
+        if not words:
+            return 0, []
+        with self._lock:
+            postings = [self._postings.get(word, []) for word in words]
+            postings.sort(key=len)
+            if not postings[0]:
+                return 0, []
+            matches = set(postings[0])
+            for other in postings[1:]:
+                matches.intersection_update(other)
+                if not matches:
+                    return 0, []
+            ordered = sorted(matches, reverse=True)
+            if status is not None:
+                ordered = [doc for doc in ordered if self._docs[doc].get('status') == status]
+            return len(ordered), [self._describe(doc) for doc in ordered[:limit]]
+
+    def cluster(self, cluster_id, limit=20):
+        with self._lock:
+            docs = list(self._clusters.get(cluster_id, ()))
+            return [self._describe(doc) for doc in reversed(docs[-limit:])]
+
+    def top_clusters(self, limit=5, min_size=2):
+        """Largest clusters with their first report as the representative text"""
+        with self._lock:
+            largest = heapq.nlargest(limit, self._clusters.items(), key=lambda item: (len(item[1]), item[1][-1]))
+            return [
+                {
+                    'cluster_id': cluster_id,
+                    'size': len(docs),
+                    # The first report, or the oldest one still indexed
+                    'text': self._docs[docs[0]]['text'],
+                    'latest': self._docs[docs[-1]].get('timestamp'),
+                    'open': sum(1 for doc in docs if self._docs[doc].get('status') == 'Open'),
+                }
+                for cluster_id, docs in largest if len(docs) >= min_size
+            ]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'concerns': len(self._docs),
+                'terms': len(self._postings),
+                'clusters': len(self._clusters),
+                'duplicates': len(self._docs) - len(self._clusters),
+            }
+
+    def _describe(self, doc):
+        entry = self._docs[doc]
+        cluster_id = self._cluster_of[doc]
+        return {
+            'id': entry.get('id'),
+            'timestamp': entry.get('timestamp'),
+            'text': entry['text'],
+            'status': entry.get('status'),
+            'cluster_id': cluster_id,
+            'cluster_size': len(self._clusters[cluster_id]),
+        }
@@ -0,0 +1,262 @@
+"""
+CitizenAI Conversation Memory
+
+Per-session chat history so follow-up questions are answered in context.
+Every turn is tokenized once, when it is added, and kept as token ids; the
+prompt for the next question is the shared prefix, a short summary of
+turns that fell out of the window, the remaining turns and the new
+question. The history is held to a token budget: when it overflows, the
+oldest turns are dropped until it fits in half the budget, so the window
+moves in large steps and the prompt stays stable between slides.
+
+Each conversation also keeps the key/value cache of its last generate
+call, so the next turn only prefills the tokens added since. Caches are
+the bulk of the memory, so they are LRU-evicted under a global byte limit;
+an evicted conversation keeps its history and rebuilds the cache on its
+next turn.
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+
+from response_cache import STOPWORDS
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+# Topics remembered from turns that left the window
+MAX_SUMMARY_TOPICS = 8
+SUMMARY_TOKENS = 32
+
+
+def cache_nbytes(cache):
+    """Size of a legacy ``((key, value), ...)`` cache in bytes"""
+    return sum(t.numel() * t.element_size() for layer in cache for t in layer)
+
+
+def cache_length(cache):
+    """Number of positions held in a legacy cache"""
+    return cache[0][0].shape[-2]
+
+
+def crop_cache(cache, length):
+    """First ``length`` positions of a legacy cache (views, no copy)"""
+    return tuple((key[..., :length, :], value[..., :length, :]) for key, value in cache)
+
+
+def topics(question, limit=3):
+    """A few content words of a question, for the summary of dropped turns"""
+    words = [w for w in _WORD.findall(question.lower()) if w not in STOPWORDS and len(w) > 2]
+    return list(dict.fromkeys(words))[:limit]
+
+
+class Turn:
+    """One answered question and its token ids in prompt form"""
+
+    __slots__ = ('question', 'answer', 'ids')
+
+    def __init__(self, question, answer, ids):
+        self.question = question
+        self.answer = answer
+        self.ids = ids
+
+
+class Conversation:
+    """History, summary and key/value cache of one chat session.
+
+    Callers hold ``lock`` for a whole turn, so two tabs of the same session
+    can't interleave their questions.
+    """
+
+    def __init__(self, conversation_id):
+        self.id = conversation_id
+        self.lock = threading.Lock()
+        self.turns = deque()
+        self.history_tokens = 0
+        self.summary_topics = []
+        self.summary_ids = []
+        self.cache = None
+        self.cache_ids = ()
+        self.cache_bytes = 0
+        self.last_used = time.monotonic()
+
+    def context_ids(self, limit=None):
+        """Token ids of the history part of the prompt.
+
+        With ``limit``, the oldest turns and then the summary are left out
+        until the rest fits.
+        """
+        summary, turns = self.summary_ids, list(self.turns)
+        if limit is not None:
+            size = len(summary) + self.history_tokens
+            while turns and size > limit:
+                size -= len(turns.pop(0).ids)
+            if size > limit:
+                summary = []
+        ids = list(summary)
+        for turn in turns:
+            ids.extend(turn.ids)
+        return ids
+
+    def cache_for(self, input_ids):
+        """Longest reusable part of the cache for ``input_ids`` as ``(cache, length)``.
+
+        At least one input token is always left uncached, since generate
+        needs logits for the position it continues from.
+        """
+        # Read once: the store may evict the cache from another thread
+        cache, cache_ids = self.cache, self.cache_ids
+        if cache is None:
+            return None, 0
+        length = 0
+        limit = min(len(cache_ids), len(input_ids) - 1)
+        while length < limit and cache_ids[length] == input_ids[length]:
+            length += 1
+        if length == 0:
+            return None, 0
+        return crop_cache(cache, length), length
+
+
+class ConversationStore:
+    """LRU collection of conversations with a shared key/value cache memory limit.
+
+    ``encode`` turns text into token ids without special tokens and
+    ``separator`` is the prompt text that follows an answer.
+    """
+
+    def __init__(self, encode, separator, token_budget=256, memory_limit=512 * 2**20, max_sessions=10000):
+        self.encode = encode
+        self.separator = separator
+        self.token_budget = token_budget
+        self.memory_limit = memory_limit
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self._conversations = OrderedDict()
+        self._separator_ids = None
+        self.cache_bytes = 0
+        self.turns = 0
+        self.slides = 0
+        self.cache_evictions = 0
+        self.session_evictions = 0
+        self.reused_tokens = 0
+        self.prefilled_tokens = 0
+
+    def get(self, conversation_id):
+        """Conversation for a session id, created on first use"""
+        with self._lock:
+            conversation = self._conversations.get(conversation_id)
+            if conversation is None:
+                conversation = Conversation(conversation_id)
+                self._conversations[conversation_id] = conversation
+                while len(self._conversations) > self.max_sessions:
+                    _, evicted = self._conversations.popitem(last=False)
+                    self._drop_cache(evicted)
+                    self.session_evictions += 1
+            else:
+                self._conversations.move_to_end(conversation_id)
+            conversation.last_used = time.monotonic()
+            return conversation
+
+    def reset(self, conversation_id):
+        with self._lock:
+            conversation = self._conversations.pop(conversation_id, None)
+            if conversation is not None:
+                self._drop_cache(conversation)
+
+    def remember(self, conversation, question, answer, question_ids, answer_ids=None, cache=None, cache_ids=None):
+        """Append a finished turn and, if given, the cache of the generate call that produced it.
+
+        ``question_ids`` are the ids of the question part of the prompt;
+        ``answer_ids`` default to tokenizing ``answer`` (answers from the
+        intent router or the response cache have no generated ids).
+        """
+        if self._separator_ids is None:
+            self._separator_ids = self.encode(self.separator)
+        if answer_ids is None:
+            answer_ids = self.encode(" " + answer)
+        turn = Turn(question, answer, list(question_ids) + list(answer_ids) + self._separator_ids)
+        conversation.turns.append(turn)
+        conversation.history_tokens += len(turn.ids)
+        self._slide(conversation)
+
+        with self._lock:
+            self.turns += 1
+            # A conversation reset or evicted mid-turn no longer counts against the limit
+            if cache is not None and self._conversations.get(conversation.id) is conversation:
+                self._drop_cache(conversation)
+                conversation.cache = cache
+                conversation.cache_ids = tuple(cache_ids)
+                conversation.cache_bytes = cache_nbytes(cache)
+                self.cache_bytes += conversation.cache_bytes
+                self._evict_caches(keep=conversation)
+
+    def record_prefill(self, reused, prefilled):
+        """Count prompt tokens taken from a cache versus computed for a turn"""
+        with self._lock:
+            self.reused_tokens += reused
+            self.prefilled_tokens += prefilled
+
+    def _slide(self, conversation):
+        """Drop the oldest turns once the history exceeds its budget, keeping their topics"""
+        if conversation.history_tokens <= self.token_budget:
+            return
+        target = self.token_budget // 2
+        dropped = []
+        # The newest turn always stays: it is what a follow-up refers to
+        while len(conversation.turns) > 1 and conversation.history_tokens > target:
+            turn = conversation.turns.popleft()
+            conversation.history_tokens -= len(turn.ids)
+            dropped.append(turn)
+        if not dropped:
+            return
+        merged = conversation.summary_topics
+        for turn in dropped:
+            merged.extend(topics(turn.question))
+        # Most recent topics first when trimming to the summary budget
+        merged = list(dict.fromkeys(reversed(merged)))[:MAX_SUMMARY_TOPICS]
+        while merged:
+            ids = self.encode(f" (Earlier topics: {', '.join(reversed(merged))})" + self.separator)
+            if len(ids) <= SUMMARY_TOKENS:
+                break
+            merged.pop()
+        conversation.summary_topics = list(reversed(merged))
+        conversation.summary_ids = ids if merged else []
+        with self._lock:
+            self.slides += 1
+
+    def _drop_cache(self, conversation):
+        self.cache_bytes -= conversation.cache_bytes
+        conversation.cache = None
+        conversation.cache_ids = ()
+        conversation.cache_bytes = 0
+
+    def _evict_caches(self, keep):
+        """Free caches of the least recently used conversations until under the memory limit"""
+        for conversation in list(self._conversations.values()):
+            if self.cache_bytes <= self.memory_limit:
+                return
+            if conversation is not keep and conversation.cache is not None:
+                self._drop_cache(conversation)
+                self.cache_evictions += 1
+        if self.cache_bytes > self.memory_limit:
+            # A single cache larger than the limit isn't worth keeping either
+            self._drop_cache(keep)
+            self.cache_evictions += 1
+
+    def stats(self):
+        with self._lock:
+            prompt_tokens = self.reused_tokens + self.prefilled_tokens
+            return {
+                'sessions': len(self._conversations),
+                'cached_sessions': sum(1 for c in self._conversations.values() if c.cache is not None),
+                'cache_bytes': self.cache_bytes,
+                'memory_limit': self.memory_limit,
+                'turns': self.turns,
+                'window_slides': self.slides,
+                'cache_evictions': self.cache_evictions,
+                'session_evictions': self.session_evictions,
+                'reused_tokens': self.reused_tokens,
+                'prefilled_tokens': self.prefilled_tokens,
+                'reuse_ratio': round(self.reused_tokens / prompt_tokens, 3) if prompt_tokens else 0.0,
+            }
@@ -0,0 +1,122 @@
+"""
+CitizenAI Sharded Counters
+
+Hot-path counters without lock contention. Every thread increments its own
+shard; a background thread periodically collects the deltas from all
+shards and pushes them to a shared aggregate (the SQLite counters table, so
+every worker process sees the merged totals). Readers get the aggregate
+plus whatever this process has not flushed yet, so counts are exact.
+"""
+
+import atexit
+import threading
+import weakref
+
+
+class ShardedCounter:
+    """Per-thread counter shards flushed into ``sink``.
+
+    ``sink(deltas)`` receives a ``{key: amount}`` dict of increments made
+    since the previous flush; ``source()`` returns the shared aggregate for
+    reads. Incrementing never takes a lock: each shard is only ever written
+    by the thread that owns it, and the flusher only reads it.
+    """
+
+    def __init__(self, keys, sink, source, flush_interval=0.5):
+        self.keys = tuple(keys)
+        self._sink = sink
+        self._source = source
+        self.flush_interval = flush_interval
+
+        self._local = threading.local()
+        self._shards = []
+        self._registry_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._unsent = dict.fromkeys(self.keys, 0)
+
+        self._stopped = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_periodically, name="citizenai-counter-flusher", daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    def increment(self, key, amount=1):
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._new_shard()
+        shard[key] += amount
+
+    def totals(self):
+        """Merged totals: the shared aggregate plus this process's unflushed increments"""
+        with self._flush_lock:
+            totals = dict(self._source())
+            for key, amount in self._pending_locked().items():
+                totals[key] = totals.get(key, 0) + amount
+        return totals
+
+    def flush(self):
+        with self._flush_lock:
+            self._flush_locked()
+
+    def close(self):
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        self.flush()
+
+    def _new_shard(self):
+        shard = dict.fromkeys(self.keys, 0)
+        self._local.shard = shard
+        with self._registry_lock:
+            self._shards.append((weakref.ref(threading.current_thread()), shard, dict.fromkeys(self.keys, 0)))
+        return shard
+
+    def _pending_locked(self):
+        pending = dict(self._unsent)
+        with self._registry_lock:
+            shards = list(self._shards)
+        for _, shard, flushed in shards:
+            for key in self.keys:
+                pending[key] += shard[key] - flushed[key]
+        return pending
+
+    def _flush_locked(self):
+        deltas = self._unsent
+        self._unsent = dict.fromkeys(self.keys, 0)
+        retired = []
+
+        with self._registry_lock:
+            shards = list(self._shards)
+        for entry in shards:
+            thread_ref, shard, flushed = entry
+            # Decide before reading: a thread that is already gone can't add more
+            thread = thread_ref()
+            finished = thread is None or not thread.is_alive()
+            for key in self.keys:
+                value = shard[key]
+                deltas[key] += value - flushed[key]
+                flushed[key] = value
+            if finished:
+                retired.append(entry)
+
+        if retired:
+            retired_ids = {id(entry) for entry in retired}
+            with self._registry_lock:
+                self._shards = [entry for entry in self._shards if id(entry) not in retired_ids]
+
+        deltas = {key: amount for key, amount in deltas.items() if amount}
+        if not deltas:
+            return
+        try:
+            self._sink(deltas)
+        except Exception:
+            for key, amount in deltas.items():
+                self._unsent[key] += amount
+            raise
+
+    def _flush_periodically(self):
+        while not self._stopped.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error flushing counters: {e}")
@@ -0,0 +1,85 @@
+"""
+CitizenAI CPU Inference Profiles
+
+Selectable optimizations for CPU-only servers, where the 4-bit
+BitsAndBytes path is unavailable: int8 dynamic quantization of the linear
+layers, bfloat16 weights, ``torch.compile`` and explicit thread counts.
+"""
+
+import os
+
+# name -> (torch dtype name, int8 dynamic quantization, torch.compile)
+PROFILES = {
+    'fp32': ('float32', False, False),
+    'int8': ('float32', True, False),
+    'bf16': ('bfloat16', False, False),
+    'fp32-compiled': ('float32', False, True),
+    'int8-compiled': ('float32', True, True),
+    'bf16-compiled': ('bfloat16', False, True),
+}
+
+DEFAULT_PROFILE = 'fp32'
+
+
+def profile_from_env():
+    """Read the CPU profile name from CITIZENAI_CPU_PROFILE"""
+    name = os.environ.get('CITIZENAI_CPU_PROFILE', DEFAULT_PROFILE)
+    if name not in PROFILES:
+        raise ValueError(f"Unknown CPU profile '{name}'. Choose from: {', '.join(PROFILES)}")
+    return name
+
+
+def apply_thread_settings(intra_op=None, inter_op=None):
+    """Set PyTorch intra/inter-op thread pools.
+
+    Values default to CITIZENAI_CPU_THREADS / CITIZENAI_CPU_INTEROP_THREADS and
+    are left untouched when unset. The inter-op pool can only be sized before
+    any parallel work has run, so a late call is reported and ignored.
+    """
+    import torch
+
+    intra_op = intra_op or int(os.environ.get('CITIZENAI_CPU_THREADS', '0'))
+    inter_op = inter_op or int(os.environ.get('CITIZENAI_CPU_INTEROP_THREADS', '0'))
+
+    if intra_op > 0:
+        torch.set_num_threads(intra_op)
+    if inter_op > 0:
+        try:
+            torch.set_num_interop_threads(inter_op)
+        except RuntimeError as e:
+            print(f"Could not set inter-op threads: {e}")
+
+    return torch.get_num_threads(), torch.get_num_interop_threads()
+
+
+def optimize_cpu_model(model, profile):
+    """Apply ``profile``'s quantization and compilation to an already loaded model"""
+    import torch
+
+    _, quantize, compile_model = PROFILES[profile]
+
+    if quantize:
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    if compile_model:
+        if hasattr(torch, 'compile'):
+            model.forward = torch.compile(model.forward, dynamic=True)
+        else:
+            print("torch.compile is not available in this PyTorch build; skipping compilation")
+
+    model.eval()
+    return model
+
+
+def load_cpu_model(model_path, profile=DEFAULT_PROFILE):
+    """Load ``model_path`` for CPU inference using the named profile"""
+    import torch
+    from transformers import AutoModelForCausalLM
+
+    dtype_name, _, _ = PROFILES[profile]
+    model = AutoModelForCausalLM.from_pretrained(
+        model_path,
+        torch_dtype=getattr(torch, dtype_name)
+    )
+    model.to("cpu")
+    return optimize_cpu_model(model, profile)
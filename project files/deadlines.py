@@ -0,0 +1,128 @@
+"""
+CitizenAI Generation Deadlines
+
+Per-request deadlines and cancellation for ``model.generate``. Each question
+carries a ``GenerationControl``; ``DeadlineStoppingCriteria`` ends the
+generate call once every request in the batch has run out of time or been
+cancelled (e.g. the client disconnected from the stream). The token budget
+also shrinks as the inference queue fills up, and ``GenerationSavings``
+counts the tokens that were never generated.
+"""
+
+import os
+import threading
+import time
+
+DEADLINE = 'deadline'
+CANCELLED = 'cancelled'
+
+# Per-request time limit (including queue wait); answers are cut short when it passes
+REQUEST_DEADLINE_SECONDS = float(os.environ.get('CITIZENAI_REQUEST_DEADLINE_SECONDS', '30'))
+
+
+class GenerationControl:
+    """Deadline and cancellation flag for one question.
+
+    ``deadline`` is an absolute ``time.monotonic()`` value, which other
+    processes on the same host share, so a worker process can enforce the
+    web process's deadline; ``cancelled_fn`` is polled as an extra
+    cancellation signal.
+    """
+
+    def __init__(self, timeout=None, deadline=None, cancelled_fn=None):
+        if deadline is None and timeout:
+            deadline = time.monotonic() + timeout
+        self.deadline = deadline
+        self.stop_reason = None
+        self._cancelled = threading.Event()
+        self._cancelled_fn = cancelled_fn
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def cancelled(self):
+        return self._cancelled.is_set() or (self._cancelled_fn is not None and self._cancelled_fn())
+
+    def expired(self):
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def reason(self):
+        """Why this question should stop now, or ``None`` to keep going"""
+        if self.cancelled():
+            return CANCELLED
+        if self.expired():
+            return DEADLINE
+        return None
+
+
+class DeadlineStoppingCriteria:
+    """Stopping criterion for ``model.generate`` driven by ``GenerationControl``s.
+
+    Rows of a batch share one generate call, so the call only stops once
+    every control asks for it; each control is then told why it was cut
+    short. Implements the StoppingCriteria call signature without importing
+    transformers, so it can live next to the lazily-loaded model code.
+    """
+
+    def __init__(self, controls):
+        self.controls = list(controls)
+        self.steps = 0
+        self.stopped = False
+
+    def __call__(self, input_ids, scores, **kwargs):
+        self.steps += 1
+        reasons = [control.reason() for control in self.controls]
+        if not reasons or None in reasons:
+            return False
+        for control, reason in zip(self.controls, reasons):
+            control.stop_reason = reason
+        self.stopped = True
+        return True
+
+
+def adaptive_max_new_tokens(max_tokens, min_tokens, waiting, max_waiting):
+    """Shrink the token budget linearly from ``max_tokens`` to ``min_tokens`` as the queue fills"""
+    if waiting <= 0 or max_waiting <= 0 or min_tokens >= max_tokens:
+        return max_tokens
+    fraction = min(1.0, waiting / max_waiting)
+    return max(min_tokens, int(round(max_tokens - (max_tokens - min_tokens) * fraction)))
+
+
+class GenerationSavings:
+    """Counters for generation work skipped by deadlines, cancellations and load-based budgets"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.stopped_by_deadline = 0
+        self.cancelled = 0
+        self.tokens_saved_deadline = 0
+        self.tokens_saved_cancelled = 0
+        self.tokens_trimmed_by_load = 0
+
+    def record(self, controls, budget, generated, trimmed=0):
+        """Account for one generate call of ``len(controls)`` rows that produced ``generated`` steps"""
+        saved = max(0, budget - generated)
+        with self._lock:
+            self.requests += len(controls)
+            self.tokens_trimmed_by_load += trimmed * len(controls)
+            for control in controls:
+                if control.stop_reason == CANCELLED:
+                    self.cancelled += 1
+                    self.tokens_saved_cancelled += saved
+                elif control.stop_reason == DEADLINE:
+                    self.stopped_by_deadline += 1
+                    self.tokens_saved_deadline += saved
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'stopped_by_deadline': self.stopped_by_deadline,
+                'cancelled': self.cancelled,
+                'tokens_saved_deadline': self.tokens_saved_deadline,
+                'tokens_saved_cancelled': self.tokens_saved_cancelled,
+                'tokens_trimmed_by_load': self.tokens_trimmed_by_load,
+                'tokens_saved_total': (self.tokens_saved_deadline + self.tokens_saved_cancelled
+                                       + self.tokens_trimmed_by_load),
+            }
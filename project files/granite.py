@@ -0,0 +1,645 @@
+"""
+CitizenAI Granite Backend
+
+Everything that runs the IBM Granite model: loading (optionally in forked
+workers, with a draft model for speculative decoding), prompt building with
+the cached system prefix, batched, streamed and multi-turn generation, the
+answer cache, deadlines and the inference queue. torch and transformers are
+imported lazily, so importing this module is cheap; the web app reaches it
+through ``responders.GraniteResponder``.
+"""
+
+import os
+import secrets
+import threading
+import time
+from concurrent.futures import wait
+
+from batching import BatchScheduler
+from conversations import ConversationStore, cache_length
+from deadlines import REQUEST_DEADLINE_SECONDS, DeadlineStoppingCriteria, GenerationControl, GenerationSavings, adaptive_max_new_tokens
+from inference_queue import INFERENCE_QUEUE_SIZE, InferenceQueue
+from instrumentation import GenerationTimer, Instrumentation
+from model_loader import ModelLoader
+from response_cache import ResponseCache
+
+# Model state (torch/transformers are imported lazily so the web server starts
+# serving before the model has loaded)
+model_path = "ibm-granite/granite-3.0-3b-a800m-instruct"
+tokenizer = None
+model = None
+
+# Optional draft model for speculative decoding; it must share model_path's tokenizer
+# (e.g. ibm-granite/granite-3.0-1b-a400m-instruct)
+draft_model_path = os.environ.get('CITIZENAI_DRAFT_MODEL', '')
+DRAFT_TOKENS = int(os.environ.get('CITIZENAI_DRAFT_TOKENS', '0'))
+SPECULATIVE_MIN_ACCEPTANCE = float(os.environ.get('CITIZENAI_SPECULATIVE_MIN_ACCEPTANCE', '0.35'))
+speculative_decoder = None
+device = None
+
+# Sampling settings shared by batched and streamed generation
+GENERATION_CONFIG = {
+    'max_new_tokens': 150,
+    'temperature': 0.7,
+    'do_sample': True,
+    'repetition_penalty': 1.1,
+}
+
+# Deterministic mode uses greedy decoding so repeated questions get identical answers
+DETERMINISTIC = os.environ.get('CITIZENAI_DETERMINISTIC', '0') == '1'
+if DETERMINISTIC:
+    GENERATION_CONFIG = {
+        'max_new_tokens': GENERATION_CONFIG['max_new_tokens'],
+        'do_sample': False,
+        'repetition_penalty': GENERATION_CONFIG['repetition_penalty'],
+    }
+
+# Token budget shrinks towards this floor as the inference queue fills up
+MIN_NEW_TOKENS = int(os.environ.get('CITIZENAI_MIN_NEW_TOKENS', '48'))
+
+# Tokens not generated thanks to deadlines, disconnects and load-adapted budgets
+generation_savings = GenerationSavings()
+
+# Cache of answers keyed on the normalized question
+response_cache = ResponseCache(
+    max_entries=int(os.environ.get('CITIZENAI_CACHE_MAX_ENTRIES', '1024')),
+    ttl_seconds=float(os.environ.get('CITIZENAI_CACHE_TTL_SECONDS', '3600'))
+)
+
+# Seconds the stream waits for the next token before giving up
+STREAM_TOKEN_TIMEOUT = float(os.environ.get('CITIZENAI_STREAM_TOKEN_TIMEOUT', '60'))
+
+# Reuse the prefilled KV-cache of the fixed system prompt across requests
+PREFIX_CACHE_ENABLED = os.environ.get('CITIZENAI_PREFIX_CACHE', '1') == '1'
+prefix_cache = None
+
+# Dynamic batching of concurrent /ask requests
+BATCH_MAX_SIZE = int(os.environ.get('CITIZENAI_BATCH_MAX_SIZE', '8'))
+BATCH_MAX_WAIT_MS = float(os.environ.get('CITIZENAI_BATCH_MAX_WAIT_MS', '20'))
+batch_scheduler = None
+
+# Optional pool of forked inference worker processes sharing one copy of the weights
+INFERENCE_WORKERS = int(os.environ.get('CITIZENAI_INFERENCE_WORKERS', '0'))
+WORKER_TIMEOUT = float(os.environ.get('CITIZENAI_WORKER_TIMEOUT', '120'))
+worker_pool = None
+
+# Multi-turn conversation memory: history kept in the prompt, and the per-session
+# KV-caches that let follow-ups skip re-encoding it
+CONVERSATION_MEMORY = os.environ.get('CITIZENAI_CONVERSATION_MEMORY', '1') == '1'
+HISTORY_TOKENS = int(os.environ.get('CITIZENAI_HISTORY_TOKENS', '1024'))
+CONVERSATION_CACHE_MB = float(os.environ.get('CITIZENAI_CONVERSATION_CACHE_MB', '512'))
+CONVERSATION_MAX_SESSIONS = int(os.environ.get('CITIZENAI_CONVERSATION_MAX_SESSIONS', '10000'))
+
+# Bounded queue in front of model calls; when it is full questions get a fast 503
+INFERENCE_CONCURRENCY = int(os.environ.get('CITIZENAI_INFERENCE_CONCURRENCY', str(max(1, BATCH_MAX_SIZE) * max(1, INFERENCE_WORKERS))))
+inference_queue = InferenceQueue(INFERENCE_CONCURRENCY, INFERENCE_QUEUE_SIZE)
+
+# Stage timers and token counts; the web app replaces this with the instrumentation it exports
+instrumentation = Instrumentation.from_env()
+
+def initialize_model(start_services=True):
+    """Initialize the IBM Granite model with quantization for better performance"""
+    global tokenizer, model, device
+    
+    print("Initializing IBM Granite model...")
+    import torch
+    from transformers import AutoTokenizer, AutoModelForCausalLM, BitsAndBytesConfig
+    from cpu_profiles import apply_thread_settings, load_cpu_model, profile_from_env
+    
+    # Determine device
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    print(f"Using device: {device}")
+    
+    try:
+        # Load tokenizer (left padding so batched prompts end at the same position)
+        tokenizer = AutoTokenizer.from_pretrained(model_path)
+        tokenizer.padding_side = "left"
+        if tokenizer.pad_token is None:
+            tokenizer.pad_token = tokenizer.eos_token
+        
+        # Configure quantization for efficient memory usage
+        if device == "cuda":
+            quantization_config = BitsAndBytesConfig(
+                load_in_4bit=True,
+                bnb_4bit_compute_dtype=torch.float16,
+                bnb_4bit_use_double_quant=True,
+                bnb_4bit_quant_type="nf4"
+            )
+            
+            model = AutoModelForCausalLM.from_pretrained(
+                model_path,
+                quantization_config=quantization_config,
+                device_map="auto",
+                torch_dtype=torch.float16
+            )
+        else:
+            # CPU inference with the configured optimization profile
+            profile = profile_from_env()
+            intra_op, inter_op = apply_thread_settings()
+            print(f"CPU profile: {profile} ({intra_op} intra-op / {inter_op} inter-op threads)")
+            model = load_cpu_model(model_path, profile)
+        
+        if draft_model_path:
+            load_draft_model()
+        
+        if start_services:
+            start_inference_services()
+        
+        print("Model initialized successfully!")
+        
+    except Exception as e:
+        print(f"Error initializing model: {e}")
+        print("Using fallback response system...")
+        return False
+    
+    return True
+
+def load_draft_model():
+    """Load the draft model next to the main one; speculative decoding stays off if it doesn't fit"""
+    global speculative_decoder
+    
+    import torch
+    from transformers import AutoTokenizer, AutoModelForCausalLM
+    from cpu_profiles import load_cpu_model, profile_from_env
+    from speculative import SpeculativeDecoder
+    
+    try:
+        if AutoTokenizer.from_pretrained(draft_model_path).get_vocab() != tokenizer.get_vocab():
+            print(f"Speculative decoding disabled: {draft_model_path} uses a different tokenizer")
+            return
+        if device == "cuda":
+            draft = AutoModelForCausalLM.from_pretrained(draft_model_path, device_map="auto", torch_dtype=torch.float16)
+        else:
+            draft = load_cpu_model(draft_model_path, profile_from_env())
+    except Exception as e:
+        print(f"Speculative decoding disabled: could not load {draft_model_path}: {e}")
+        return
+    
+    speculative_decoder = SpeculativeDecoder(
+        model,
+        draft,
+        draft_tokens=DRAFT_TOKENS,
+        min_acceptance=SPECULATIVE_MIN_ACCEPTANCE
+    )
+    print(f"Speculative decoding enabled with draft model {draft_model_path}")
+
+def start_inference_services(batching=True):
+    """Prefill the prompt prefix cache and start the batching thread for the loaded model"""
+    global prefix_cache, batch_scheduler
+    
+    if PREFIX_CACHE_ENABLED:
+        from prefix_cache import PrefixCache
+        
+        prefix_cache = PrefixCache(model, tokenizer, PROMPT_PREFIX, device).prefill()
+        print(f"System prompt prefix cached ({prefix_cache.prefix_length} tokens)")
+    
+    if batching and BATCH_MAX_SIZE > 1:
+        batch_scheduler = BatchScheduler(
+            granite_generate_requests,
+            max_batch_size=BATCH_MAX_SIZE,
+            max_wait_ms=BATCH_MAX_WAIT_MS,
+            observe_wait=instrumentation.observe_queue_wait
+        ).start()
+        print(f"Dynamic batching enabled (max {BATCH_MAX_SIZE} requests / {BATCH_MAX_WAIT_MS} ms)")
+
+def warm_up_model():
+    """Run one short generation so the first real request doesn't pay for lazy initialization"""
+    granite_generate_batch(["What services does the city offer?"])
+
+# Loads and warms up the model in the background while pages are already served
+model_loader = ModelLoader(initialize_model, warm_up_model)
+
+def load_model_for_workers():
+    """Load weights in the worker pool supervisor; threads are started after the fork"""
+    return initialize_model(start_services=False)
+
+def start_worker_services():
+    """Runs in every forked worker before it accepts questions"""
+    # Workers batch the questions they take from the pool queue themselves
+    start_inference_services(batching=False)
+    # Each worker pays its own first-call cost before it reports ready
+    warm_up_model()
+
+# Fixed system prompt shared by every request; its KV-cache is computed once
+PROMPT_PREFIX = """You are a helpful AI assistant for a government citizen engagement platform. 
+        Provide clear, accurate, and helpful information about government services, policies, and civic processes.
+        
+        Question:"""
+
+def build_prompt_suffix(question):
+    """Per-question part of the prompt that follows PROMPT_PREFIX"""
+    return f""" {question}
+        
+        Answer:"""
+
+# Follows each answer when earlier turns are replayed in a conversation prompt
+TURN_SEPARATOR = """
+        
+        Question:"""
+
+# Longest prompt passed to the model, in tokens
+MAX_PROMPT_TOKENS = 512
+
+# Longest conversation prompt, well inside Granite's 4096-token context. The
+# history budget must leave most of it unused: every time the history slides,
+# the session's KV-cache stops matching the prompt and is rebuilt
+MAX_CONVERSATION_PROMPT_TOKENS = 1536
+
+# Part of a conversation prompt the history always leaves to the system prompt and the new question
+QUESTION_ROOM_TOKENS = 384
+
+conversations = ConversationStore(
+    lambda text: encode_text(text),
+    TURN_SEPARATOR,
+    token_budget=min(HISTORY_TOKENS, MAX_CONVERSATION_PROMPT_TOKENS - QUESTION_ROOM_TOKENS),
+    memory_limit=int(CONVERSATION_CACHE_MB * 2**20),
+    max_sessions=CONVERSATION_MAX_SESSIONS
+)
+
+def build_prompt(question):
+    """Format the prompt for government services context"""
+    return PROMPT_PREFIX + build_prompt_suffix(question)
+
+def prepare_inputs(questions):
+    """Tokenize questions into model.generate keyword arguments"""
+    if prefix_cache is not None:
+        # Only the question tokens need prefilling; the prefix comes from the cache
+        return prefix_cache.build_inputs([build_prompt_suffix(q) for q in questions], max_length=MAX_PROMPT_TOKENS)
+    
+    # Tokenize full prompts (left-padded to a common length)
+    prompts = [build_prompt(question) for question in questions]
+    inputs = tokenizer(prompts, return_tensors="pt", padding=True, truncation=True, max_length=MAX_PROMPT_TOKENS)
+    inputs = inputs.to(device)
+    return {'input_ids': inputs.input_ids, 'attention_mask': inputs.attention_mask}
+
+def encode_text(text):
+    """Token ids of ``text`` without special tokens, for prompts assembled from pieces"""
+    return tokenizer(text, add_special_tokens=False).input_ids
+
+def prompt_prefix_ids():
+    """Token ids every prompt starts with (exactly those of the prefix cache when enabled)"""
+    if prefix_cache is not None:
+        return prefix_cache.prefix_ids[0].tolist()
+    return tokenizer(PROMPT_PREFIX).input_ids
+
+def prepare_conversation_inputs(conversation, question):
+    """Prompt ids for a follow-up (prefix, history, question) and the longest reusable KV-cache.
+    
+    Returns ``(question_ids, input_ids, past_key_values, reused_tokens)``.
+    """
+    from prefix_cache import from_legacy_cache
+    
+    prefix_ids = prompt_prefix_ids()
+    # Only a question too long for the prompt on its own is cut, keeping its
+    # end so the prompt still ends with "Answer:"
+    question_ids = encode_text(build_prompt_suffix(question))[-(MAX_CONVERSATION_PROMPT_TOKENS - len(prefix_ids)):]
+    # Earlier turns give way to the new question
+    history_ids = conversation.context_ids(MAX_CONVERSATION_PROMPT_TOKENS - len(prefix_ids) - len(question_ids))
+    input_ids = prefix_ids + history_ids + question_ids
+    
+    cache, reused = conversation.cache_for(input_ids)
+    past = from_legacy_cache(cache) if cache is not None else None
+    if prefix_cache is not None and reused < prefix_cache.prefix_length:
+        # Evicted or invalidated: at least the system prompt needn't be recomputed
+        past, reused = prefix_cache.copy_for_batch(1), prefix_cache.prefix_length
+    return question_ids, input_ids, past, reused
+
+def generation_settings(controls):
+    """generate() settings with a queue-adapted token budget and a deadline/cancellation criterion"""
+    from transformers import StoppingCriteriaList
+    
+    waiting = inference_queue.depth() - inference_queue.workers
+    budget = adaptive_max_new_tokens(GENERATION_CONFIG['max_new_tokens'], MIN_NEW_TOKENS, waiting, inference_queue.max_queue)
+    criteria = DeadlineStoppingCriteria(controls)
+    settings = {**GENERATION_CONFIG, 'max_new_tokens': budget, 'stopping_criteria': StoppingCriteriaList([criteria])}
+    return settings, criteria
+
+def model_generate(**kwargs):
+    """model.generate, through the speculative decoder when a draft model is loaded"""
+    if speculative_decoder is not None:
+        return speculative_decoder.generate(model, **kwargs)
+    return model.generate(**kwargs)
+
+def record_savings(controls, settings, generated_steps):
+    budget = settings['max_new_tokens']
+    generation_savings.record(controls, budget, generated_steps, GENERATION_CONFIG['max_new_tokens'] - budget)
+
+def granite_generate_batch(questions, controls=None):
+    """Generate responses for several questions with one batched model.generate call"""
+    import torch
+    
+    controls = controls or [GenerationControl(REQUEST_DEADLINE_SECONDS) for _ in questions]
+    settings, _ = generation_settings(controls)
+    
+    with instrumentation.stage('tokenize'):
+        inputs = prepare_inputs(questions)
+    
+    # Generate responses (the timer splits the call into prefill and decode)
+    timer = GenerationTimer() if instrumentation.enabled else None
+    with torch.no_grad():
+        outputs = model_generate(
+            **inputs,
+            pad_token_id=tokenizer.pad_token_id,
+            streamer=timer,
+            **settings
+        )
+    
+    # Decode only the generated part of each row
+    prompt_length = inputs['input_ids'].shape[1]
+    generated = outputs[:, prompt_length:]
+    record_savings(controls, settings, generated.shape[1])
+    with instrumentation.stage('detokenize'):
+        responses = tokenizer.batch_decode(generated, skip_special_tokens=True)
+    
+    if timer is not None:
+        instrumentation.observe_generation(
+            inputs['attention_mask'].sum(dim=1).tolist(),
+            (generated != tokenizer.pad_token_id).sum(dim=1).tolist(),
+            timer.record(instrumentation)
+        )
+    return [response.strip() for response in responses]
+
+def granite_generate_requests(requests):
+    """Batch function for the scheduler: ``requests`` are (question, GenerationControl) pairs"""
+    return granite_generate_batch([question for question, _ in requests], [control for _, control in requests])
+
+def granite_generate_local(question, control=None):
+    """Generate a response with the model loaded in this process"""
+    control = control or GenerationControl(REQUEST_DEADLINE_SECONDS)
+    if batch_scheduler is not None:
+        # Share a batched generate call with other concurrent requests
+        return batch_scheduler.submit((question, control)).result()
+    return granite_generate_batch([question], [control])[0]
+
+def granite_generate_worker_batch(payloads, is_cancelled):
+    """Worker pool handler: answer ``(question, deadline)`` payloads with the web process's deadlines"""
+    controls = [GenerationControl(deadline=deadline, cancelled_fn=lambda i=i: is_cancelled(i))
+                for i, (_, deadline) in enumerate(payloads)]
+    responses = granite_generate_batch([question for question, _ in payloads], controls)
+    return [(response, control.stop_reason) for response, control in zip(responses, controls)]
+
+def worker_generate(question, control):
+    """Answer in the worker pool; the worker stops when ``control`` is cancelled or WORKER_TIMEOUT passes"""
+    future = worker_pool.submit((question, control.deadline))
+    give_up_at = time.monotonic() + WORKER_TIMEOUT
+    try:
+        while not future.done():
+            if control.cancelled():
+                raise RuntimeError("Question cancelled")
+            if time.monotonic() >= give_up_at:
+                raise RuntimeError("Inference worker timed out")
+            wait([future], timeout=0.1)
+        response, control.stop_reason = future.result()
+        return response
+    finally:
+        # No-op once answered; otherwise the worker stops generating for this question
+        worker_pool.cancel(future)
+
+def granite_answer(question, control):
+    """Answer from the cache or the model; raises if generation fails.
+    
+    Answers cut short by the deadline are returned (possibly empty) but not cached.
+    """
+    cached = response_cache.get(question)
+    if cached is not None:
+        return cached
+    
+    if worker_pool is not None:
+        response = worker_generate(question, control)
+    else:
+        response = granite_generate_local(question, control)
+    if control.stop_reason is None:
+        response_cache.set(question, response)
+    return response
+
+def granite_generate_response(question, control=None):
+    """Generate response using IBM Granite model"""
+    if worker_pool is not None:
+        if worker_pool.failed:
+            return "I'm currently setting up my AI capabilities. Please try again in a moment."
+    elif model is None or tokenizer is None:
+        return "I'm currently setting up my AI capabilities. Please try again in a moment."
+    
+    control = control or GenerationControl(REQUEST_DEADLINE_SECONDS)
+    try:
+        response = granite_answer(question, control)
+    except Exception as e:
+        print(f"Error generating response: {e}")
+        return "I apologize, but I'm experiencing technical difficulties. Please try again later."
+    if control.stop_reason is not None:
+        return response or "I'm sorry, that took longer than expected. Please try asking again."
+    return response
+
+def granite_stream_response(question, control=None):
+    """Yield pieces of the Granite response as they are generated"""
+    if worker_pool is not None:
+        # Tokens can't be streamed across the worker pool; send the whole answer at once
+        yield granite_generate_response(question, control)
+        return
+    
+    if model is None or tokenizer is None:
+        yield "I'm currently setting up my AI capabilities. Please try again in a moment."
+        return
+    
+    cached = response_cache.get(question)
+    if cached is not None:
+        yield cached
+        return
+    
+    control = control or GenerationControl(REQUEST_DEADLINE_SECONDS)
+    settings, criteria = generation_settings([control])
+    with instrumentation.stage('tokenize'):
+        inputs = prepare_inputs([question])
+    streamer = text_streamer()
+    timer = GenerationTimer(streamer) if instrumentation.enabled else None
+    
+    def generate():
+        model_generate(
+            **inputs,
+            pad_token_id=tokenizer.pad_token_id,
+            streamer=timer or streamer,
+            **settings
+        )
+        record_savings([control], settings, criteria.steps)
+    
+    pieces = []
+    yield from stream_in_thread(generate, streamer, control, pieces)
+    if control.stop_reason is not None:
+        # Cut short by the deadline: don't cache a partial answer
+        if not pieces:
+            yield "I'm sorry, that took longer than expected. Please try asking again."
+        return
+    if timer is not None:
+        instrumentation.observe_generation(
+            inputs['attention_mask'].sum(dim=1).tolist(),
+            [timer.steps],
+            timer.record(instrumentation)
+        )
+    response_cache.set(question, "".join(pieces).strip())
+
+def text_streamer():
+    """Streamer that hands decoded text from model.generate to another thread"""
+    from transformers import TextIteratorStreamer
+    
+    return TextIteratorStreamer(
+        tokenizer,
+        skip_prompt=True,
+        skip_special_tokens=True,
+        timeout=STREAM_TOKEN_TIMEOUT
+    )
+
+def stream_in_thread(generate, streamer, control, pieces):
+    """Run ``generate`` in a worker thread and yield the text it pushes into ``streamer``.
+    
+    Yielded text is also collected in ``pieces``. Raises RuntimeError after
+    the streamed text if generate failed, so the caller neither caches nor
+    remembers the answer; closing the generator early cancels ``control``.
+    """
+    errors = []
+    
+    def run():
+        try:
+            generate()
+        except Exception as e:
+            errors.append(e)
+            streamer.end()
+    
+    # model.generate pushes decoded text into the streamer from a worker thread
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    finished = False
+    try:
+        for text in streamer:
+            pieces.append(text)
+            yield text
+        finished = True
+    finally:
+        if not finished:
+            # The client went away: stop generating tokens nobody will read
+            control.cancel()
+    thread.join()
+    if errors:
+        raise RuntimeError(f"Streamed generation failed: {errors[0]}") from errors[0]
+
+def remember_turn(conversation, question, answer):
+    """Add an answer that didn't come from a conversation-aware generate call"""
+    conversations.remember(conversation, question, answer, encode_text(build_prompt_suffix(question)))
+
+def granite_generate_turn(conversation, question, control, streamer=None):
+    """Answer a follow-up with the conversation in the prompt, reusing its KV-cache.
+    
+    Only the tokens added since the session's last generate call are
+    prefilled. The turn and the new cache are remembered unless the client
+    went away. Call with ``conversation.lock`` held.
+    """
+    import torch
+    from prefix_cache import to_legacy_cache
+    
+    settings, _ = generation_settings([control])
+    with instrumentation.stage('tokenize'):
+        question_ids, input_ids, past, reused = prepare_conversation_inputs(conversation, question)
+    conversations.record_prefill(reused, len(input_ids) - reused)
+    
+    prompt = torch.tensor([input_ids], device=device)
+    cache_kwargs = {'past_key_values': past} if past is not None else {}
+    timer = GenerationTimer(streamer) if instrumentation.enabled else None
+    with torch.no_grad():
+        outputs = model_generate(
+            input_ids=prompt,
+            attention_mask=torch.ones_like(prompt),
+            pad_token_id=tokenizer.pad_token_id,
+            streamer=timer or streamer,
+            return_dict_in_generate=True,
+            **cache_kwargs,
+            **settings
+        )
+    
+    sequence = outputs.sequences[0].tolist()
+    answer_ids = sequence[len(input_ids):]
+    record_savings([control], settings, len(answer_ids))
+    while answer_ids and answer_ids[-1] in (tokenizer.eos_token_id, tokenizer.pad_token_id):
+        answer_ids.pop()
+    with instrumentation.stage('detokenize'):
+        answer = tokenizer.decode(answer_ids, skip_special_tokens=True).strip()
+    if timer is not None:
+        instrumentation.observe_generation([len(input_ids)], [len(answer_ids)], timer.record(instrumentation))
+    
+    if answer and not control.cancelled():
+        # The cache covers the prompt and all but the last generated token
+        cache = to_legacy_cache(outputs.past_key_values)
+        conversations.remember(conversation, question, answer, question_ids, answer_ids,
+                               cache=cache, cache_ids=sequence[:cache_length(cache)])
+    return answer
+
+def granite_generate_followup(conversation, question, control=None):
+    """Generate a response that takes the session's earlier questions into account"""
+    control = control or GenerationControl(REQUEST_DEADLINE_SECONDS)
+    with conversation.lock:
+        if model is None:
+            return granite_generate_response(question, control)
+        
+        try:
+            if conversation.turns:
+                response = granite_generate_turn(conversation, question, control)
+            else:
+                # Opening questions are answered like standalone ones: batched and cached
+                response = granite_answer(question, control)
+                # Only complete answers become turns; apologies and cut-short answers don't
+                if response and control.stop_reason is None:
+                    remember_turn(conversation, question, response)
+        except Exception as e:
+            print(f"Error generating response: {e}")
+            return "I apologize, but I'm experiencing technical difficulties. Please try again later."
+    return response or "I'm sorry, that took longer than expected. Please try asking again."
+
+def granite_stream_followup(conversation, question, control=None):
+    """Streaming counterpart of granite_generate_followup"""
+    control = control or GenerationControl(REQUEST_DEADLINE_SECONDS)
+    with conversation.lock:
+        if model is None or not conversation.turns:
+            pieces = []
+            for text in granite_stream_response(question, control):
+                pieces.append(text)
+                yield text
+            # Raised above if generation failed; the setup message (no model) isn't a turn either
+            if model is not None and control.stop_reason is None:
+                remember_turn(conversation, question, "".join(pieces).strip())
+            return
+        
+        streamer = text_streamer()
+        pieces = []
+        yield from stream_in_thread(
+            lambda: granite_generate_turn(conversation, question, control, streamer),
+            streamer, control, pieces
+        )
+        if not pieces:
+            yield "I'm sorry, that took longer than expected. Please try asking again."
+
+def conversation_for(session):
+    """Conversation memory of a browser session (a Flask ``session``), or None where it isn't available"""
+    # Forked workers only receive single questions, so follow-ups need the in-process model
+    if not CONVERSATION_MEMORY or worker_pool is not None or tokenizer is None:
+        return None
+    if 'conversation_id' not in session:
+        session['conversation_id'] = secrets.token_hex(16)
+    return conversations.get(session['conversation_id'])
+
+def start_model_services():
+    """Start loading the model: in a forked worker pool if configured, otherwise in the background"""
+    global worker_pool
+    
+    if INFERENCE_WORKERS > 0:
+        from inference_workers import WorkerPool
+        
+        # Fork the pool before the server starts any request threads
+        worker_pool = WorkerPool(
+            INFERENCE_WORKERS,
+            load_fn=load_model_for_workers,
+            handle_fn=granite_generate_worker_batch,
+            post_fork_fn=start_worker_services,
+            batch_size=BATCH_MAX_SIZE,
+            batch_wait_ms=BATCH_MAX_WAIT_MS
+        ).start()
+        print(f"Started inference worker pool ({INFERENCE_WORKERS} workers)")
+    else:
+        model_loader.start()
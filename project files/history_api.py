@@ -0,0 +1,113 @@
+"""
+CitizenAI History API Helpers
+
+Request parsing, opaque cursors and JSONL export for the cursor-paginated
+``/api/history`` and ``/api/concerns`` endpoints shared by both apps.
+"""
+
+import base64
+import json
+import re
+from datetime import datetime
+
+from storage import SORT_KEYS
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+EXPORT_PAGE_SIZE = 1000
+
+_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}( \d{2}:\d{2}(:\d{2})?)?$")
+
+
+def encode_cursor(key, sort, descending):
+    """Opaque token for the position after ``key`` (a ``(timestamp, id)`` pair)"""
+    raw = json.dumps([sort, descending, key[0], key[1]], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    """Inverse of ``encode_cursor``; raises ``ValueError`` for malformed tokens"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        sort, descending, timestamp, row_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    # Fields reach SQLite as parameters, so anything but the expected scalars is a bad request
+    if (not isinstance(sort, str) or sort not in SORT_KEYS or not isinstance(descending, bool)
+            or not isinstance(timestamp, str) or not isinstance(row_id, int) or isinstance(row_id, bool)):
+        raise ValueError("Invalid cursor")
+    return sort, descending, (timestamp, row_id)
+
+
+def parse_timestamp(value, name):
+    """Accept ``YYYY-MM-DD`` or ``YYYY-MM-DD HH:MM[:SS]`` (``T`` also allowed as separator)"""
+    if not value:
+        return None
+    value = value.strip().replace('T', ' ')
+    if not _DATE.match(value):
+        raise ValueError(f"'{name}' must look like YYYY-MM-DD or YYYY-MM-DD HH:MM:SS")
+    for fmt in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(value, fmt).strftime('%Y-%m-%d %H:%M:%S')
+        except ValueError:
+            continue
+    raise ValueError(f"'{name}' is not a valid date")
+
+
+def parse_query(args, allow_status=False):
+    """Turn request args into ``Store.query_page`` keyword arguments; raises ``ValueError``"""
+    filters = {
+        'since': parse_timestamp(args.get('since'), 'since'),
+        'until': parse_timestamp(args.get('until'), 'until'),
+        'sort': args.get('sort', 'id'),
+        'descending': args.get('order', 'asc') == 'desc',
+    }
+    if filters['sort'] not in SORT_KEYS:
+        raise ValueError(f"'sort' must be one of: {', '.join(SORT_KEYS)}")
+    if args.get('order', 'asc') not in ('asc', 'desc'):
+        raise ValueError("'order' must be 'asc' or 'desc'")
+    if allow_status and args.get('status'):
+        filters['status'] = args.get('status')
+
+    after = None
+    if args.get('cursor'):
+        sort, descending, after = decode_cursor(args.get('cursor'))
+        # A cursor only makes sense with the ordering it was issued for
+        filters['sort'], filters['descending'] = sort, descending
+    try:
+        limit = int(args.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        raise ValueError("'limit' must be an integer") from None
+    return after, min(max(limit, 1), MAX_LIMIT), filters
+
+
+def page_payload(store, table, args, allow_status=False):
+    """JSON body for one page: rows plus the cursor for the next page"""
+    after, limit, filters = parse_query(args, allow_status)
+    rows, next_key = store.query_page(table, after=after, limit=limit, **filters)
+    next_cursor = encode_cursor(next_key, filters['sort'], filters['descending']) if next_key else None
+    return {'items': rows, 'count': len(rows), 'next_cursor': next_cursor}
+
+
+def export_jsonl(store, table, filters):
+    """Yield the matching rows as JSON lines, one page-sized chunk at a time"""
+    for rows in store.iter_pages(table, page_size=EXPORT_PAGE_SIZE, **filters):
+        yield ''.join(json.dumps(row, ensure_ascii=False) + '\n' for row in rows)
+
+
+def history_response(store, table, allow_status=False):
+    """Flask response for a history endpoint: one JSON page, or a JSONL export with ?format=jsonl"""
+    from flask import Response, jsonify, request, stream_with_context
+
+    try:
+        if request.args.get('format') == 'jsonl':
+            _, _, filters = parse_query(request.args, allow_status)
+            filename = f"{table}-{datetime.now():%Y%m%d-%H%M%S}.jsonl"
+            return Response(
+                stream_with_context(export_jsonl(store, table, filters)),
+                mimetype='application/x-ndjson',
+                headers={'Content-Disposition': f'attachment; filename="{filename}"', 'X-Accel-Buffering': 'no'}
+            )
+        return jsonify(page_payload(store, table, request.args, allow_status))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
@@ -0,0 +1,116 @@
+"""
+CitizenAI Inference Admission Queue
+
+Model calls run on a dedicated, fixed-size executor behind a bounded queue.
+When every slot is taken new questions are rejected immediately with
+``Overloaded`` (which the app turns into a 503 with ``Retry-After``)
+instead of piling up, so request threads stay free for pages, static files
+and the dashboard however deep the inference backlog gets.
+"""
+
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Questions allowed to wait for a free inference slot before new ones are turned away
+INFERENCE_QUEUE_SIZE = int(os.environ.get('CITIZENAI_INFERENCE_QUEUE_SIZE', '32'))
+
+
+class Overloaded(Exception):
+    """Raised when the inference queue is full"""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Inference queue is full; retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class InferenceQueue:
+    """Bounded admission in front of ``workers`` inference threads.
+
+    At most ``workers + max_queue`` questions are admitted at once: ``workers``
+    running and up to ``max_queue`` waiting. ``submit`` runs a call on the
+    executor; ``admit`` reserves a slot for work that brings its own thread
+    (streamed generation) and must be released when that work ends.
+    """
+
+    def __init__(self, workers=1, max_queue=16, name="citizenai-inference"):
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.workers = workers
+        self.max_queue = max(0, max_queue)
+        self.capacity = workers + self.max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._admitted = 0
+
+        # Counters for monitoring and Retry-After estimates
+        self.completed = 0
+        self.rejected = 0
+        self.service_seconds = 0.0
+
+    def admit(self):
+        """Reserve a slot or raise ``Overloaded``; returns a release callable"""
+        with self._lock:
+            if self._admitted >= self.capacity:
+                self.rejected += 1
+                raise Overloaded(self._retry_after_locked())
+            self._admitted += 1
+        start = time.perf_counter()
+        released = []
+
+        def release():
+            # Idempotent: streams release from their generator and again when the response closes
+            with self._lock:
+                if released:
+                    return
+                released.append(True)
+                self._admitted -= 1
+                self.completed += 1
+                self.service_seconds += time.perf_counter() - start
+
+        return release
+
+    def submit(self, fn, *args):
+        """Run ``fn(*args)`` on the inference executor; raises ``Overloaded`` when full"""
+        release = self.admit()
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            release()
+            raise
+        future.add_done_callback(lambda _: release())
+        return future
+
+    def call(self, fn, *args, timeout=None):
+        """Submit ``fn(*args)`` and wait for its result"""
+        return self.submit(fn, *args).result(timeout=timeout)
+
+    def depth(self):
+        """Questions admitted and not yet finished (running + waiting)"""
+        return self._admitted
+
+    def retry_after(self):
+        with self._lock:
+            return self._retry_after_locked()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'capacity': self.capacity,
+                'admitted': self._admitted,
+                'waiting': max(0, self._admitted - self.workers),
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'avg_service_ms': (self.service_seconds / self.completed * 1000) if self.completed else 0.0,
+            }
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+    def _retry_after_locked(self):
+        # Whole seconds until the backlog ahead of a new request should have drained
+        average = (self.service_seconds / self.completed) if self.completed else 1.0
+        return max(1, math.ceil(average * self._admitted / self.workers))
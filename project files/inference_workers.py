@@ -0,0 +1,309 @@
+"""
+CitizenAI Inference Worker Pool
+
+Runs generation in N worker processes that share one copy of the model
+weights. A supervisor process loads the model once and forks the workers
+from it, so the weight pages are shared copy-on-write instead of being
+duplicated per worker. The supervisor restarts crashed workers and the
+Flask front end talks to the pool over multiprocessing queues.
+"""
+
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+# Worker states stored in shared memory
+STARTING = 0
+READY = 1
+DEAD = 2
+
+STATE_NAMES = {STARTING: 'starting', READY: 'ready', DEAD: 'dead'}
+
+
+def _next_batch(requests, batch_size, batch_wait):
+    """Block for one message, then take whatever else arrives within ``batch_wait`` seconds.
+
+    Returns ``(messages, stop)``; ``stop`` is set when a shutdown sentinel was read.
+    """
+    first = requests.get(timeout=1.0)
+    if first is None:
+        return [], True
+    batch = [first]
+    deadline = time.monotonic() + batch_wait
+    while len(batch) < batch_size:
+        remaining = deadline - time.monotonic()
+        try:
+            message = requests.get(timeout=remaining) if remaining > 0 else requests.get_nowait()
+        except queue.Empty:
+            break
+        if message is None:
+            return batch, True
+        batch.append(message)
+    return batch, False
+
+
+def _worker_main(slot, handle_fn, post_fork_fn, requests, results, shared, parent_pid, batch_size, batch_wait):
+    """Worker loop: take batches of questions from ``requests`` and answer them with ``handle_fn``"""
+    if post_fork_fn is not None:
+        post_fork_fn()
+    shared['state'][slot] = READY
+    shared['heartbeat'][slot] = time.time()
+    current = slice(slot * batch_size, (slot + 1) * batch_size)
+
+    stop = False
+    while not stop:
+        if os.getppid() != parent_pid:
+            break  # supervisor is gone
+        try:
+            batch, stop = _next_batch(requests, batch_size, batch_wait)
+        except queue.Empty:
+            shared['heartbeat'][slot] = time.time()
+            continue
+        if not batch:
+            break
+
+        # Publish the batch before reading the cancelled ids, so a concurrent
+        # cancel() either sees it in 'current' or is seen here
+        shared['current'][current] = [request_id for request_id, _ in batch] + [0] * (batch_size - len(batch))
+        cancelled = set(shared['cancelled'][:])
+        skipped = [request_id for request_id, _ in batch if request_id in cancelled]
+        if skipped:
+            # The caller gave up while these were queued; don't generate them
+            batch = [message for message in batch if message[0] not in cancelled]
+            shared['current'][current] = [request_id for request_id, _ in batch] + [0] * (batch_size - len(batch))
+            shared['skipped'][slot] += len(skipped)
+            if not batch:
+                shared['heartbeat'][slot] = time.time()
+                continue
+        request_ids = [request_id for request_id, _ in batch]
+
+        def is_cancelled(index):
+            return shared['cancel'][current.start + index] == request_ids[index]
+
+        try:
+            answers = handle_fn([payload for _, payload in batch], is_cancelled)
+            for request_id, answer in zip(request_ids, answers):
+                results.put(('result', request_id, True, answer))
+        except Exception as e:
+            for request_id in request_ids:
+                results.put(('result', request_id, False, str(e)))
+        shared['current'][current] = [0] * batch_size
+        shared['served'][slot] += len(batch)
+        shared['heartbeat'][slot] = time.time()
+
+
+def _supervisor_main(num_workers, load_fn, post_fork_fn, handle_fn, requests, results, shared, parent_pid,
+                     batch_size, batch_wait):
+    """Load the model once, fork the workers and keep them alive"""
+    ctx = multiprocessing.get_context('fork')
+    if not load_fn():
+        results.put(('failed', 0, 0))
+        return
+
+    supervisor_pid = os.getpid()
+    processes = [None] * num_workers
+
+    def spawn(slot):
+        shared['state'][slot] = STARTING
+        shared['current'][slot * batch_size:(slot + 1) * batch_size] = [0] * batch_size
+        process = ctx.Process(
+            target=_worker_main,
+            args=(slot, handle_fn, post_fork_fn, requests, results, shared, supervisor_pid, batch_size, batch_wait),
+            name=f"citizenai-worker-{slot}",
+            daemon=True
+        )
+        process.start()
+        shared['pid'][slot] = process.pid
+        processes[slot] = process
+
+    for slot in range(num_workers):
+        spawn(slot)
+
+    try:
+        while os.getppid() == parent_pid:
+            for slot, process in enumerate(processes):
+                if process.is_alive():
+                    continue
+                # Fail whatever the dead worker was holding, then replace it
+                shared['state'][slot] = DEAD
+                held = shared['current'][slot * batch_size:(slot + 1) * batch_size]
+                results.put(('crashed', slot, [request_id for request_id in held if request_id]))
+                shared['restarts'][slot] += 1
+                print(f"Inference worker {slot} exited with code {process.exitcode}; restarting")
+                spawn(slot)
+            time.sleep(0.5)
+    finally:
+        for process in processes:
+            if process is not None and process.is_alive():
+                process.terminate()
+
+
+class WorkerPool:
+    """Front-end handle for a pool of forked inference workers.
+
+    ``load_fn`` runs once in the supervisor and must return ``True`` on
+    success; ``post_fork_fn`` runs in every worker before it accepts work
+    (start per-process threads or caches there, never before the fork);
+    ``handle_fn(payloads, is_cancelled)`` maps a list of submitted payloads
+    to their results; ``is_cancelled(i)`` tells whether the caller has given
+    up on ``payloads[i]`` (see ``cancel``). Each worker hands it up to
+    ``batch_size`` payloads at once: whatever is queued when it becomes free
+    plus what arrives within ``batch_wait_ms``. Payloads cancelled while
+    still queued are dropped when a worker takes them.
+    """
+
+    def __init__(self, num_workers, load_fn, handle_fn, post_fork_fn=None, max_queue=1024,
+                 batch_size=1, batch_wait_ms=0.0):
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            raise RuntimeError("The inference worker pool needs the 'fork' start method (Linux/macOS)")
+
+        self.num_workers = num_workers
+        self.load_fn = load_fn
+        self.handle_fn = handle_fn
+        self.post_fork_fn = post_fork_fn
+        self.batch_size = max(1, batch_size)
+        self.batch_wait = batch_wait_ms / 1000.0
+
+        self._ctx = multiprocessing.get_context('fork')
+        self._requests = self._ctx.Queue(max_queue)
+        self._results = self._ctx.Queue()
+        self._shared = {
+            'state': self._ctx.Array('i', num_workers, lock=False),
+            'pid': self._ctx.Array('i', num_workers, lock=False),
+            # Request ids each worker is answering, batch_size entries per worker
+            'current': self._ctx.Array('q', num_workers * self.batch_size, lock=False),
+            # Ids of cancelled requests, written at the position the request holds in 'current'
+            'cancel': self._ctx.Array('q', num_workers * self.batch_size, lock=False),
+            # Ring of recently cancelled ids, so workers skip them if they are still queued
+            'cancelled': self._ctx.Array('q', max(64, max_queue), lock=False),
+            'skipped': self._ctx.Array('q', num_workers, lock=False),
+            'served': self._ctx.Array('q', num_workers, lock=False),
+            'restarts': self._ctx.Array('i', num_workers, lock=False),
+            'heartbeat': self._ctx.Array('d', num_workers, lock=False),
+        }
+
+        self._ids = itertools.count(1)
+        self._cancelled_slots = itertools.count()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._supervisor = None
+        self._collector = None
+        self.failed = False
+
+    def start(self):
+        """Fork the supervisor. Call before the web server starts its threads."""
+        self._supervisor = self._ctx.Process(
+            target=_supervisor_main,
+            args=(self.num_workers, self.load_fn, self.post_fork_fn, self.handle_fn,
+                  self._requests, self._results, self._shared, os.getpid(),
+                  self.batch_size, self.batch_wait),
+            name="citizenai-supervisor"
+        )
+        self._supervisor.start()
+        self._collector = threading.Thread(target=self._collect, name="citizenai-pool-results", daemon=True)
+        self._collector.start()
+        return self
+
+    def stop(self):
+        for _ in range(self.num_workers):
+            try:
+                self._requests.put_nowait(None)
+            except queue.Full:
+                break
+        if self._supervisor is not None:
+            self._supervisor.terminate()
+            self._supervisor.join(5)
+
+    def submit(self, payload):
+        """Send ``payload`` to the next free worker and return a Future for its result.
+
+        Pass the future to ``cancel`` when giving up on it (e.g. after a
+        timeout) so the pool stops tracking it and the worker stops answering.
+        """
+        future = Future()
+        request_id = next(self._ids)
+        future.request_id = request_id
+        with self._lock:
+            self._pending[request_id] = future
+        future.add_done_callback(lambda _: self._forget(request_id))
+        try:
+            self._requests.put_nowait((request_id, payload))
+        except queue.Full:
+            with self._lock:
+                self._pending.pop(request_id, None)
+            raise RuntimeError("Inference queue is full")
+        return future
+
+    def cancel(self, future):
+        """Give up on a submitted payload; a no-op once its result has arrived"""
+        if not future.cancel():
+            return
+        ring = self._shared['cancelled']
+        with self._lock:
+            ring[next(self._cancelled_slots) % len(ring)] = future.request_id
+        current = self._shared['current']
+        for index in range(len(current)):
+            if current[index] == future.request_id:
+                self._shared['cancel'][index] = future.request_id
+
+    def _forget(self, request_id):
+        with self._lock:
+            self._pending.pop(request_id, None)
+
+    def is_ready(self):
+        return any(state == READY for state in self._shared['state'])
+
+    def snapshot(self):
+        """Per-worker health for /healthz and /readyz"""
+        now = time.time()
+        workers = []
+        for slot in range(self.num_workers):
+            heartbeat = self._shared['heartbeat'][slot]
+            held = self._shared['current'][slot * self.batch_size:(slot + 1) * self.batch_size]
+            workers.append({
+                'slot': slot,
+                'pid': self._shared['pid'][slot],
+                'state': STATE_NAMES.get(self._shared['state'][slot], 'unknown'),
+                'served': self._shared['served'][slot],
+                'skipped_cancelled': self._shared['skipped'][slot],
+                'restarts': self._shared['restarts'][slot],
+                'busy': sum(1 for request_id in held if request_id),
+                'heartbeat_age': round(now - heartbeat, 2) if heartbeat else None,
+            })
+        return {
+            'state': 'failed' if self.failed else ('ready' if self.is_ready() else 'loading'),
+            'supervisor_alive': self._supervisor is not None and self._supervisor.is_alive(),
+            'pending': len(self._pending),
+            'workers': workers,
+        }
+
+    def _collect(self):
+        """Resolve futures as results (or crash notices) come back from the workers"""
+        while True:
+            message = self._results.get()
+            kind = message[0]
+            if kind == 'result':
+                _, request_id, ok, payload = message
+                with self._lock:
+                    future = self._pending.pop(request_id, None)
+                # Skip futures the caller already gave up on
+                if future is None or not future.set_running_or_notify_cancel():
+                    continue
+                if ok:
+                    future.set_result(payload)
+                else:
+                    future.set_exception(RuntimeError(payload))
+            elif kind == 'crashed':
+                _, _, request_ids = message
+                with self._lock:
+                    futures = [self._pending.pop(request_id, None) for request_id in request_ids]
+                for future in futures:
+                    if future is not None and future.set_running_or_notify_cancel():
+                        future.set_exception(RuntimeError("Inference worker crashed"))
+            elif kind == 'failed':
+                self.failed = True
+                print("Inference worker pool failed to load the model")
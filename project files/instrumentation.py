@@ -0,0 +1,272 @@
+"""
+CitizenAI Instrumentation
+
+Per-stage inference timers (tokenize, prefill, decode, detokenize, render),
+token counts, generation throughput, queue wait and route latency, exported
+as Prometheus histograms in the text exposition format. An optional hook
+profiles a random sample of requests with cProfile.
+
+When disabled every entry point returns immediately, so the instrumented
+code paths cost one attribute check.
+"""
+
+import bisect
+import cProfile
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+TOKEN_BUCKETS = (8, 16, 32, 64, 128, 256, 512, 1024)
+THROUGHPUT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+_NULL_CONTEXT = nullcontext()
+
+
+class Histogram:
+    """Prometheus-style histogram with optional labels"""
+
+    def __init__(self, name, help_text, buckets=LATENCY_BUCKETS, labelnames=()):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def observe(self, value, *labelvalues):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                # Per-bucket (non-cumulative) counts, then +Inf, sum
+                series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def snapshot(self):
+        """{labelvalues: (count, sum)}"""
+        with self._lock:
+            return {labels: (sum(counts), total) for labels, (counts, total) in self._series.items()}
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {labels: (list(counts), total) for labels, (counts, total) in self._series.items()}
+        for labelvalues, (counts, total) in sorted(series.items()):
+            labels = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, labelvalues)]
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(float(bound))
+                bucket_labels = ','.join(labels + ['le="%s"' % le])
+                lines.append(f"{self.name}_bucket{{{bucket_labels}}} {cumulative}")
+            suffix = f"{{{','.join(labels)}}}" if labels else ""
+            lines.append(f"{self.name}_sum{suffix} {total}")
+            lines.append(f"{self.name}_count{suffix} {cumulative}")
+        return "\n".join(lines)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Instrumentation:
+    """Registry of the app's histograms plus the helpers that feed them"""
+
+    def __init__(self, enabled=True, profile_sample_rate=0.0, profile_dir='profiles'):
+        self.enabled = enabled
+        self.profile_sample_rate = profile_sample_rate
+        self.profile_dir = profile_dir
+        # Only one cProfile profiler can be active per process
+        self._profile_lock = threading.Lock()
+
+        self.stage_seconds = Histogram(
+            'citizenai_inference_stage_seconds', 'Time spent in each inference stage',
+            labelnames=('stage',))
+        self.queue_wait_seconds = Histogram(
+            'citizenai_queue_wait_seconds', 'Time a question waited before its generate call started')
+        self.prompt_tokens = Histogram(
+            'citizenai_prompt_tokens', 'Prompt length in tokens per question', TOKEN_BUCKETS)
+        self.generated_tokens = Histogram(
+            'citizenai_generated_tokens', 'Generated tokens per question', TOKEN_BUCKETS)
+        self.tokens_per_second = Histogram(
+            'citizenai_generation_tokens_per_second', 'Generated tokens per second of each generate call',
+            THROUGHPUT_BUCKETS)
+        self.stream_first_token_seconds = Histogram(
+            'citizenai_stream_first_token_seconds', 'Time from the start of a streamed answer to its first token')
+        self.stream_seconds = Histogram(
+            'citizenai_stream_duration_seconds', 'Total time to stream an answer')
+        self.request_seconds = Histogram(
+            'citizenai_http_request_duration_seconds', 'HTTP request latency by route',
+            labelnames=('method', 'route', 'status'))
+        self.histograms = [self.stage_seconds, self.queue_wait_seconds, self.prompt_tokens,
+                           self.generated_tokens, self.tokens_per_second, self.stream_first_token_seconds,
+                           self.stream_seconds, self.request_seconds]
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            enabled=os.environ.get('CITIZENAI_METRICS', '1') == '1',
+            profile_sample_rate=float(os.environ.get('CITIZENAI_PROFILE_SAMPLE_RATE', '0')),
+            profile_dir=os.environ.get('CITIZENAI_PROFILE_DIR', 'profiles')
+        )
+
+    # Recording
+
+    def stage(self, name):
+        """Context manager timing one inference stage"""
+        if not self.enabled:
+            return _NULL_CONTEXT
+        return self._timed_stage(name)
+
+    @contextmanager
+    def _timed_stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_seconds.observe(time.perf_counter() - start, name)
+
+    def observe_stage(self, name, seconds):
+        if self.enabled:
+            self.stage_seconds.observe(seconds, name)
+
+    def observe_queue_wait(self, seconds):
+        if self.enabled:
+            self.queue_wait_seconds.observe(seconds)
+
+    def observe_generation(self, prompt_tokens, generated_tokens, seconds):
+        """Record per-question token counts and the call's tokens/sec"""
+        if not self.enabled:
+            return
+        for count in prompt_tokens:
+            self.prompt_tokens.observe(count)
+        for count in generated_tokens:
+            self.generated_tokens.observe(count)
+        if seconds > 0:
+            self.tokens_per_second.observe(sum(generated_tokens) / seconds)
+
+    def observe_stream(self, first_token_seconds, seconds):
+        if self.enabled:
+            self.stream_first_token_seconds.observe(first_token_seconds)
+            self.stream_seconds.observe(seconds)
+
+    def render(self):
+        """All histograms in the Prometheus text exposition format"""
+        return "\n".join(histogram.render() for histogram in self.histograms) + "\n"
+
+    # Flask integration
+
+    def install(self, app):
+        """Time every request and template render, and sample requests for profiling"""
+        from flask import before_render_template, g, request, template_rendered
+
+        instrumentation = self
+
+        @app.before_request
+        def _start_request_timer():
+            if not instrumentation.enabled:
+                return
+            g.citizenai_request_start = time.perf_counter()
+            if instrumentation.profile_sample_rate > 0 and random.random() < instrumentation.profile_sample_rate:
+                g.citizenai_profiler = instrumentation._start_profile()
+
+        @app.teardown_request
+        def _stop_request_timer(exc):
+            start = g.pop('citizenai_request_start', None)
+            if start is None:
+                return
+            profiler = g.pop('citizenai_profiler', None)
+            if profiler is not None:
+                instrumentation._finish_profile(profiler, request.endpoint)
+            route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+            status = g.pop('citizenai_status', 500 if exc is not None else 200)
+            instrumentation.request_seconds.observe(time.perf_counter() - start, request.method, route, status)
+
+        @app.after_request
+        def _record_status(response):
+            if instrumentation.enabled:
+                g.citizenai_status = response.status_code
+            return response
+
+        def _template_started(sender, template, context, **extra):
+            if instrumentation.enabled:
+                g.citizenai_render_start = time.perf_counter()
+
+        def _template_finished(sender, template, context, **extra):
+            start = g.pop('citizenai_render_start', None)
+            if start is not None:
+                instrumentation.stage_seconds.observe(time.perf_counter() - start, 'render')
+
+        # Signals hold weak references by default; keep these alive with the app
+        before_render_template.connect(_template_started, app, weak=False)
+        template_rendered.connect(_template_finished, app, weak=False)
+        return self
+
+    def _start_profile(self):
+        if not self._profile_lock.acquire(blocking=False):
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler (e.g. a debugger) is already running
+            self._profile_lock.release()
+            return None
+        return profiler
+
+    def _finish_profile(self, profiler, endpoint):
+        try:
+            profiler.disable()
+            os.makedirs(self.profile_dir, exist_ok=True)
+            name = f"{time.strftime('%Y%m%d-%H%M%S')}-{endpoint or 'unknown'}-{os.getpid()}-{threading.get_ident()}.prof"
+            profiler.dump_stats(os.path.join(self.profile_dir, name))
+        except OSError as e:
+            print(f"Error writing request profile: {e}")
+        finally:
+            self._profile_lock.release()
+
+
+class GenerationTimer:
+    """``model.generate`` streamer that splits the call into prefill and decode.
+
+    generate() first hands the streamer the prompt, then the new tokens of
+    each step (several at once with speculative decoding), so the first step
+    marks the end of prefill; ``steps`` counts tokens. Pass another streamer as
+    ``inner`` to keep it working (e.g. TextIteratorStreamer for SSE).
+    """
+
+    def __init__(self, inner=None):
+        self.inner = inner
+        self.start = time.perf_counter()
+        self.first_token_at = None
+        self.end_at = None
+        self.steps = 0
+        self._prompt_seen = False
+
+    def put(self, value):
+        if self._prompt_seen:
+            if self.first_token_at is None:
+                self.first_token_at = time.perf_counter()
+            # (batch,) for a regular step, (1, n) for n tokens accepted from a draft
+            self.steps += value.shape[-1] if len(value.shape) > 1 else 1
+        else:
+            self._prompt_seen = True
+        if self.inner is not None:
+            self.inner.put(value)
+
+    def end(self):
+        self.end_at = time.perf_counter()
+        if self.inner is not None:
+            self.inner.end()
+
+    def record(self, instrumentation):
+        """Report prefill and decode times; returns the total generate seconds"""
+        end = self.end_at or time.perf_counter()
+        first = self.first_token_at or end
+        instrumentation.observe_stage('prefill', first - self.start)
+        instrumentation.observe_stage('decode', end - first)
+        return end - self.start
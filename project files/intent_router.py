@@ -0,0 +1,149 @@
+"""
+CitizenAI Intent Router
+
+Keyword fast-path for common questions. The intent config is compiled into
+a token -> intent hash index, so routing a question costs one dictionary
+lookup per word. Each intent has ``keywords`` that name its topic and
+``related`` words that typically come with it ("property" taxes, a
+"building" permit). A question is answered straight from the config only
+when it hits a keyword, the intent's words cover most of what it asks, and
+the best intent leads the runner-up by a clear margin; anything else, like
+"my street light is broken, who fixes it?", is left to the model.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from collections import namedtuple
+
+from response_cache import STOPWORDS
+
+DEFAULT_CONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'intents.json')
+INTENTS_PATH = os.environ.get('CITIZENAI_INTENTS_PATH', DEFAULT_CONFIG)
+
+IntentMatch = namedtuple('IntentMatch', ['intent', 'response', 'score'])
+
+_WORDS = re.compile(r"[a-z0-9]+")
+
+
+class IntentRouter:
+    """Routes questions to canned intent answers when the match is confident"""
+
+    def __init__(self, intents, min_confidence=0.5, min_margin=0.5, max_words=30, filler=()):
+        self.min_confidence = min_confidence
+        self.min_margin = min_margin
+        self.max_words = max_words
+        # Request verbs like "get" or "apply" say nothing about the topic
+        self.ignored = STOPWORDS | {word.lower() for word in filler}
+        self.responses = {}
+        self.index = {}
+        # Ties go to the intent listed first in the config
+        self.order = {}
+        for intent in intents:
+            name = intent['name']
+            self.responses[name] = intent['response']
+            self.order[name] = len(self.order)
+            weight = float(intent.get('weight', 1.0))
+            for keyword in intent['keywords']:
+                self.index.setdefault(keyword.lower(), []).append((name, weight, True))
+            for word in intent.get('related', ()):
+                self.index.setdefault(word.lower(), []).append((name, weight, False))
+
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.ambiguous = 0
+        self.hits_by_intent = dict.fromkeys(self.responses, 0)
+        self.route_seconds = 0.0
+        self.fallback_calls = 0
+        self.fallback_seconds = 0.0
+
+    @classmethod
+    def from_file(cls, path=INTENTS_PATH, **overrides):
+        """Router from a JSON config; keyword arguments override its thresholds"""
+        with open(path, encoding='utf-8') as handle:
+            config = json.load(handle)
+        settings = {
+            'min_confidence': config.get('min_confidence', 0.5),
+            'min_margin': config.get('min_margin', 0.5),
+            'max_words': config.get('max_words', 30),
+            'filler': config.get('filler', ()),
+        }
+        settings.update(overrides)
+        return cls(config['intents'], **settings)
+
+    def match(self, question):
+        """Return ``(IntentMatch or None, ambiguous)`` without touching the counters.
+
+        Only intents with a keyword in the question are candidates. The match
+        score is the weight of the intent's keywords and related words found
+        in the question, divided by the number of distinct content words
+        (neither stopwords, filler nor single letters).
+        """
+        words = _WORDS.findall(question.lower())
+        if not words or len(words) > self.max_words:
+            return None, False
+        ignored = self.ignored
+        content = {word for word in words if len(word) > 1 and word not in ignored} or set(words)
+
+        keywords = {}
+        related = {}
+        index = self.index
+        for word in content:
+            for name, weight, is_keyword in index.get(word, ()):
+                hits = keywords if is_keyword else related
+                hits[name] = hits.get(name, 0.0) + weight
+        if not keywords:
+            return None, False
+        scores = {name: score + related.get(name, 0.0) for name, score in keywords.items()}
+
+        order = self.order
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], order[item[0]]))
+        best_name, best_score = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+        confidence = best_score / len(content)
+        if confidence < self.min_confidence or best_score - runner_up < self.min_margin:
+            return None, True
+        return IntentMatch(best_name, self.responses[best_name], round(confidence, 3)), False
+
+    def route(self, question):
+        """Match ``question`` and record hit/miss metrics"""
+        start = time.perf_counter()
+        match, ambiguous = self.match(question)
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self.route_seconds += elapsed
+            if match is not None:
+                self.hits += 1
+                self.hits_by_intent[match.intent] += 1
+            else:
+                self.misses += 1
+                if ambiguous:
+                    self.ambiguous += 1
+        return match
+
+    def observe_fallback(self, seconds):
+        """Record how long an unmatched question took on the slow path"""
+        with self._lock:
+            self.fallback_calls += 1
+            self.fallback_seconds += seconds
+
+    def stats(self):
+        with self._lock:
+            routed = self.hits + self.misses
+            avg_fallback = (self.fallback_seconds / self.fallback_calls) if self.fallback_calls else 0.0
+            avg_route = (self.route_seconds / routed) if routed else 0.0
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'ambiguous': self.ambiguous,
+                'hit_rate': (self.hits / routed) if routed else 0.0,
+                'hits_by_intent': dict(self.hits_by_intent),
+                'avg_route_ms': avg_route * 1000,
+                'avg_fallback_ms': avg_fallback * 1000,
+                # Each hit skipped one slow-path call of average duration
+                'latency_saved_seconds': self.hits * max(avg_fallback - avg_route, 0.0),
+            }
@@ -0,0 +1,87 @@
+"""
+CitizenAI Background Model Loader
+
+Loads the AI model in a background thread so the web server can answer
+requests immediately, tracking progress through a small state machine.
+"""
+
+import threading
+import time
+
+IDLE = 'idle'
+LOADING = 'loading'
+WARMING_UP = 'warming_up'
+READY = 'ready'
+FAILED = 'failed'
+
+
+class ModelLoader:
+    """Runs ``load_fn`` then ``warmup_fn`` in a daemon thread.
+
+    ``load_fn`` returns ``True`` on success (``False`` or an exception marks the
+    loader as failed). ``warmup_fn`` runs a first generation so the model is
+    only reported ready once it can answer at full speed.
+    """
+
+    def __init__(self, load_fn, warmup_fn=None):
+        self.load_fn = load_fn
+        self.warmup_fn = warmup_fn
+        self.state = IDLE
+        self.error = None
+        self.started_at = None
+        self.ready_at = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self._ready = threading.Event()
+
+    def start(self):
+        """Begin loading in the background (no-op if already started)"""
+        with self._lock:
+            if self.state != IDLE:
+                return self
+            self.state = LOADING
+            self.started_at = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="citizenai-model-loader", daemon=True)
+        self._thread.start()
+        return self
+
+    def is_ready(self):
+        return self.state == READY
+
+    def wait(self, timeout=None):
+        """Block until the model is ready; returns ``False`` on timeout"""
+        return self._ready.wait(timeout)
+
+    def snapshot(self):
+        elapsed = None
+        if self.started_at is not None:
+            end = self.ready_at if self.ready_at is not None else time.monotonic()
+            elapsed = round(end - self.started_at, 3)
+        return {
+            'state': self.state,
+            'error': self.error,
+            'load_seconds': elapsed,
+        }
+
+    def _run(self):
+        try:
+            if not self.load_fn():
+                self._fail("model initialization failed")
+                return
+            if self.warmup_fn is not None:
+                self.state = WARMING_UP
+                self.warmup_fn()
+        except Exception as e:
+            self._fail(str(e))
+            return
+
+        self.ready_at = time.monotonic()
+        self.state = READY
+        self._ready.set()
+        print(f"Model ready after {self.ready_at - self.started_at:.1f}s")
+
+    def _fail(self, message):
+        self.error = message
+        self.ready_at = time.monotonic()
+        self.state = FAILED
+        print(f"Model loading failed: {message}")
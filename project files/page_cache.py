@@ -0,0 +1,197 @@
+"""
+CitizenAI Page Cache
+
+Serves pages whose output never changes (home, about, services) and the
+files under ``static/`` from memory. Each is rendered or read once, again
+only when its template or file changes on disk, and kept with precompressed
+gzip (and brotli, if installed) variants and strong ETags so repeat visits
+get a 304. The disk is checked for changes at most once every
+``CITIZENAI_PAGE_CHECK_SECONDS`` per page or file, or on every request
+when templates auto-reload (debug mode), so cache hits don't stat files. ``url_for('static', ...)`` adds a content fingerprint (``?v=``)
+to asset URLs; fingerprinted requests are cached by browsers for a year.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import threading
+import time
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+PAGE_CACHE_CONTROL = 'public, max-age=0, must-revalidate'
+ASSET_CACHE_CONTROL = 'public, max-age=300'
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# Below this size compression costs more than it saves
+MIN_COMPRESS_BYTES = 512
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
+
+# Seconds between checks of a cached page's template or a static file on disk
+PAGE_CHECK_SECONDS = float(os.environ.get('CITIZENAI_PAGE_CHECK_SECONDS', '2'))
+
+
+class CachedBody:
+    """One representation set: the raw bytes plus compressed variants and their ETags"""
+
+    def __init__(self, body, mimetype, compress=True):
+        self.mimetype = mimetype
+        digest = hashlib.sha256(body).hexdigest()
+        self.fingerprint = digest[:12]
+        # Each encoding is a different representation, so it gets its own strong ETag
+        self.variants = {'identity': (body, digest[:32])}
+        if compress and len(body) >= MIN_COMPRESS_BYTES:
+            self.variants['gzip'] = (gzip.compress(body, compresslevel=9, mtime=0), f"{digest[:32]}-gz")
+            if brotli is not None:
+                self.variants['br'] = (brotli.compress(body, quality=11), f"{digest[:32]}-br")
+
+    def choose(self, accept_encodings):
+        """Smallest variant the client accepts"""
+        for encoding in ('br', 'gzip'):
+            if encoding in self.variants and accept_encodings.quality(encoding) > 0:
+                return encoding
+        return 'identity'
+
+
+class PageCache:
+    """Pre-rendered pages and fingerprinted, precompressed static files for a Flask app"""
+
+    def __init__(self, app, check_interval=PAGE_CHECK_SECONDS):
+        self.app = app
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._pages = {}      # template name -> (CachedBody, template uptodate check, assets version)
+        self._assets = {}     # static filename -> (CachedBody, (mtime, size))
+        self._checked = {}    # ('page' | 'asset', name) -> monotonic time of the last check on disk
+        self.hits = 0
+        self.renders = 0
+
+        app.url_defaults(self._fingerprint_static_urls)
+        app.view_functions['static'] = self.serve_static
+
+    # Pages
+
+    def serve(self, template_name, **context):
+        """Response for a page that renders the same for every visitor"""
+        from flask import render_template
+
+        entry = self._pages.get(template_name)
+        if entry is None or (self._due('page', template_name) and self._stale(entry)):
+            with self._lock:
+                entry = self._pages.get(template_name)
+                if entry is None or self._stale(entry):
+                    body = render_template(template_name, **context).encode('utf-8')
+                    # Rendering fingerprints the assets the page links to
+                    entry = (CachedBody(body, 'text/html'), self._uptodate(template_name), self._assets_version())
+                    self._pages[template_name] = entry
+                    self.renders += 1
+        self.hits += 1
+        return self._respond(entry[0], PAGE_CACHE_CONTROL)
+
+    def _stale(self, entry):
+        return not entry[1]() or entry[2] != self._assets_version()
+
+    def _uptodate(self, template_name):
+        """Jinja's own freshness check for the template file (always fresh if it can't tell)"""
+        _, _, uptodate = self.app.jinja_loader.get_source(self.app.jinja_env, template_name)
+        return uptodate or (lambda: True)
+
+    # Static files
+
+    def serve_static(self, filename):
+        """Replacement for Flask's static view: from memory, precompressed, with ETags"""
+        from flask import abort, request
+
+        entry = self._asset(filename)
+        if entry is None:
+            abort(404)
+        fingerprinted = request.args.get('v') == entry.fingerprint
+        return self._respond(entry, IMMUTABLE_CACHE_CONTROL if fingerprinted else ASSET_CACHE_CONTROL)
+
+    def asset_fingerprint(self, filename):
+        entry = self._asset(filename)
+        return entry.fingerprint if entry is not None else None
+
+    def _asset(self, filename):
+        from werkzeug.security import safe_join
+
+        cached = self._assets.get(filename)
+        if cached is not None and not self._due('asset', filename):
+            return cached[0]
+        path = safe_join(self.app.static_folder, filename)
+        if path is None:
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if not os.path.isfile(path):
+            return None
+        version = (stat.st_mtime_ns, stat.st_size)
+
+        if cached is not None and cached[1] == version:
+            return cached[0]
+        with open(path, 'rb') as handle:
+            body = handle.read()
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        entry = CachedBody(body, mimetype, compress=mimetype.startswith(COMPRESSIBLE_TYPES))
+        self._assets[filename] = (entry, version)
+        return entry
+
+    def _assets_version(self):
+        """Changes whenever a known asset changes on disk, so pages linking to it are re-rendered"""
+        version = []
+        for name in sorted(self._assets):
+            entry = self._asset(name)
+            version.append((name, entry.fingerprint if entry is not None else None))
+        return tuple(version)
+
+    def _fingerprint_static_urls(self, endpoint, values):
+        if endpoint == 'static' and 'filename' in values and 'v' not in values:
+            fingerprint = self.asset_fingerprint(values['filename'])
+            if fingerprint is not None:
+                values['v'] = fingerprint
+
+    # Shared
+
+    def _due(self, kind, name):
+        """Whether a cached page or file should be checked against the disk now"""
+        if self.app.debug or self.app.config.get('TEMPLATES_AUTO_RELOAD'):
+            return True
+        now = time.monotonic()
+        key = (kind, name)
+        if now - self._checked.get(key, float('-inf')) < self.check_interval:
+            return False
+        self._checked[key] = now
+        return True
+
+    def _respond(self, entry, cache_control):
+        from flask import make_response, request
+
+        encoding = entry.choose(request.accept_encodings)
+        body, etag = entry.variants[encoding]
+
+        if request.if_none_match.contains_weak(etag):
+            response = make_response('', 304)
+        else:
+            response = make_response(body)
+            response.mimetype = entry.mimetype
+            if encoding != 'identity':
+                response.headers['Content-Encoding'] = encoding
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = cache_control
+        response.headers['Vary'] = 'Accept-Encoding'
+        return response
+
+    def stats(self):
+        return {
+            'pages': len(self._pages),
+            'assets': len(self._assets),
+            'hits': self.hits,
+            'renders': self.renders,
+            'brotli': brotli is not None,
+        }
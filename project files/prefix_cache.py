@@ -0,0 +1,94 @@
+"""
+CitizenAI Prefix KV-Cache
+
+Prefills the fixed system-prompt prefix once and hands every request a
+private copy of its ``past_key_values``, so only the question and answer
+tokens are computed per call.
+"""
+
+import torch
+
+try:
+    from transformers import DynamicCache
+except ImportError:  # transformers < 4.36 only knows legacy tuple caches
+    DynamicCache = None
+
+
+def to_legacy_cache(past):
+    """``((key, value), ...)`` form of a cache returned by the model"""
+    if hasattr(past, "to_legacy_cache"):
+        past = past.to_legacy_cache()
+    return tuple((key.detach(), value.detach()) for key, value in past)
+
+
+def from_legacy_cache(legacy):
+    """Cache object generate() accepts, built from the legacy form"""
+    if DynamicCache is not None:
+        return DynamicCache.from_legacy_cache(legacy)
+    return legacy
+
+
+class PrefixCache:
+    """Precomputed key/value cache for a prompt prefix shared by all requests"""
+
+    def __init__(self, model, tokenizer, prefix_text, device="cpu"):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.prefix_text = prefix_text
+        self.device = device
+        self.prefix_ids = None
+        self.past_key_values = None
+
+    @property
+    def prefix_length(self):
+        return 0 if self.prefix_ids is None else self.prefix_ids.shape[1]
+
+    def prefill(self):
+        """Tokenize the prefix and run it through the model once"""
+        encoded = self.tokenizer(self.prefix_text, return_tensors="pt")
+        self.prefix_ids = encoded.input_ids.to(self.device)
+
+        with torch.no_grad():
+            outputs = self.model(self.prefix_ids, use_cache=True)
+
+        # Keep an immutable master copy; requests only ever see clones
+        self.past_key_values = to_legacy_cache(outputs.past_key_values)
+        return self
+
+    def copy_for_batch(self, batch_size):
+        """Return a fresh cache for ``batch_size`` rows that generate may mutate freely"""
+        legacy = tuple(
+            (
+                key.expand(batch_size, *key.shape[1:]).clone(),
+                value.expand(batch_size, *value.shape[1:]).clone(),
+            )
+            for key, value in self.past_key_values
+        )
+        return from_legacy_cache(legacy)
+
+    def build_inputs(self, suffixes, max_length=512):
+        """Build generate() kwargs for prompts made of the cached prefix plus ``suffixes``.
+
+        Suffixes are left-padded to a common length and placed after the
+        prefix; the padding is masked out so every row sees the same prefix
+        followed directly by its own question.
+        """
+        budget = max(1, max_length - self.prefix_length)
+        encoded = self.tokenizer(
+            suffixes,
+            return_tensors="pt",
+            padding=True,
+            truncation=True,
+            max_length=budget,
+            add_special_tokens=False
+        ).to(self.device)
+
+        batch_size = encoded.input_ids.shape[0]
+        prefix_ids = self.prefix_ids.expand(batch_size, -1)
+        prefix_mask = torch.ones_like(prefix_ids)
+
+        return {
+            'input_ids': torch.cat([prefix_ids, encoded.input_ids], dim=1),
+            'attention_mask': torch.cat([prefix_mask, encoded.attention_mask], dim=1),
+            'past_key_values': self.copy_for_batch(batch_size),
+        }
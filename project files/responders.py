@@ -0,0 +1,234 @@
+"""
+CitizenAI Responders
+
+The part of the app that answers chat questions, chosen at startup:
+
+- ``granite``: the IBM Granite model (``granite.py``)
+- ``demo``: canned answers, no model
+- ``stub``: a fixed answer after a configurable delay, standing in for the
+  model in load tests so the rest of the production path runs unchanged
+
+Questions the intent router can answer never reach the responder. Each
+responder imports its own heavy dependencies, so demo and stub deployments
+start without importing torch.
+"""
+
+import os
+import random
+import time
+from abc import ABC, abstractmethod
+
+from inference_queue import INFERENCE_QUEUE_SIZE, InferenceQueue
+from intent_router import IntentRouter
+
+RESPONDERS = ('granite', 'demo', 'stub')
+
+
+class Responder(ABC):
+    """Backend interface; backends implement ``answer`` and inherit the no-model defaults of the rest"""
+
+    name = None
+    database = 'citizenai.db'
+    # Answers that are worth queueing go through a bounded inference queue
+    inference_queue = None
+
+    def install(self, app, instrumentation):
+        """Hook into the Flask app: extra routes, shared instrumentation"""
+
+    def start(self):
+        """Begin loading models; called once by the server entry point"""
+
+    @abstractmethod
+    def answer(self, question, control, conversation=None):
+        """The full answer to ``question``, generated within ``control``'s deadline"""
+
+    def stream(self, question, control, conversation=None):
+        """Pieces of the answer as they are produced"""
+        yield self.answer(question, control, conversation)
+
+    def conversation(self, session):
+        """Multi-turn memory for a browser session, if this backend keeps any"""
+        return None
+
+    def remember(self, conversation, question, answer):
+        """Record an answer given by the intent router as a turn of ``conversation``"""
+
+    def forget(self, session):
+        """Drop the conversation memory of a browser session"""
+
+    def snapshot(self):
+        return {'state': 'ready', 'responder': self.name}
+
+    def is_ready(self):
+        return True
+
+    def metrics(self):
+        """Extra Prometheus text appended to /metrics"""
+        return ""
+
+
+class DemoResponder(Responder):
+    """Canned topic answers on any keyword hit, else a pointer to the citizen services portal"""
+
+    name = 'demo'
+    database = 'citizenai_demo.db'
+
+    def __init__(self):
+        # The intent config with no confidence bar: one keyword picks the topic,
+        # as the demo always did, even when the app's router finds it too vague
+        self.topics = IntentRouter.from_file(min_confidence=0.0, min_margin=0.0, max_words=float('inf'))
+
+    def answer(self, question, control=None, conversation=None):
+        match, _ = self.topics.match(question)
+        if match is not None:
+            return match.response
+        return f"Thank you for your question about '{question}'. For specific information, please contact the relevant department or visit our comprehensive citizen services portal. Our staff is available Monday-Friday, 8 AM - 5 PM to assist you."
+
+    def stream(self, question, control=None, conversation=None):
+        """Yield the demo response word by word to mimic token streaming"""
+        for word in self.answer(question).split(' '):
+            yield word + ' '
+
+
+STUB_ANSWER = (
+    "Thank you for your question. You can find details on our citizen services "
+    "portal or contact the relevant department during office hours."
+)
+
+
+class StubResponder(Responder):
+    """Fixed answer after a model-like delay, queued like model calls"""
+
+    name = 'stub'
+
+    def __init__(self, latency_ms=50.0, jitter_ms=0.0, concurrency=8, max_queue=INFERENCE_QUEUE_SIZE):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.inference_queue = InferenceQueue(concurrency, max_queue)
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            latency_ms=float(os.environ.get('CITIZENAI_STUB_LATENCY_MS', '50')),
+            jitter_ms=float(os.environ.get('CITIZENAI_STUB_JITTER_MS', '0')),
+            concurrency=int(os.environ.get('CITIZENAI_INFERENCE_CONCURRENCY', '8'))
+        )
+
+    def _delay(self):
+        time.sleep(max(0.0, self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000.0)
+
+    def answer(self, question, control=None, conversation=None):
+        self._delay()
+        return STUB_ANSWER
+
+    def stream(self, question, control=None, conversation=None):
+        self._delay()
+        for word in STUB_ANSWER.split(' '):
+            yield word + ' '
+
+
+class GraniteResponder(Responder):
+    """IBM Granite answers with batching, caching, deadlines and conversation memory"""
+
+    name = 'granite'
+
+    def __init__(self):
+        import granite
+
+        self.granite = granite
+        self.inference_queue = granite.inference_queue
+
+    def install(self, app, instrumentation):
+        from flask import jsonify, redirect, session, url_for
+
+        granite = self.granite
+        # Stage timings and token counts land in the registry the app exports
+        granite.instrumentation = instrumentation
+
+        @app.route('/admin/cache', methods=['GET'])
+        def cache_stats():
+            """Response cache statistics"""
+            if 'logged_in' not in session:
+                return redirect(url_for('login'))
+
+            return jsonify(granite.response_cache.stats())
+
+        @app.route('/admin/cache/flush', methods=['POST'])
+        def flush_cache():
+            """Drop every cached answer"""
+            if 'logged_in' not in session:
+                return redirect(url_for('login'))
+
+            flushed = granite.response_cache.flush()
+            return jsonify({'flushed': flushed, **granite.response_cache.stats()})
+
+        @app.route('/admin/generation', methods=['GET'])
+        def generation_stats():
+            """Tokens saved by deadlines, disconnects and load-adapted budgets, plus speculative decoding stats"""
+            if 'logged_in' not in session:
+                return redirect(url_for('login'))
+
+            stats = granite.generation_savings.snapshot()
+            if granite.speculative_decoder is not None:
+                stats['speculative'] = granite.speculative_decoder.stats()
+            return jsonify(stats)
+
+        @app.route('/admin/conversations', methods=['GET'])
+        def conversation_stats():
+            """Conversation memory: sessions, KV-cache memory, evictions and prompt tokens reused"""
+            if 'logged_in' not in session:
+                return redirect(url_for('login'))
+
+            return jsonify(granite.conversations.stats())
+
+    def start(self):
+        self.granite.start_model_services()
+
+    def answer(self, question, control, conversation=None):
+        if conversation is not None:
+            return self.granite.granite_generate_followup(conversation, question, control)
+        return self.granite.granite_generate_response(question, control)
+
+    def stream(self, question, control, conversation=None):
+        if conversation is not None:
+            return self.granite.granite_stream_followup(conversation, question, control)
+        return self.granite.granite_stream_response(question, control)
+
+    def conversation(self, session):
+        return self.granite.conversation_for(session)
+
+    def remember(self, conversation, question, answer):
+        with conversation.lock:
+            self.granite.remember_turn(conversation, question, answer)
+
+    def forget(self, session):
+        self.granite.conversations.reset(session.pop('conversation_id', None))
+
+    def snapshot(self):
+        granite = self.granite
+        if granite.worker_pool is not None:
+            return granite.worker_pool.snapshot()
+        return granite.model_loader.snapshot()
+
+    def is_ready(self):
+        granite = self.granite
+        if granite.worker_pool is not None:
+            return granite.worker_pool.is_ready()
+        return granite.model_loader.is_ready()
+
+    def metrics(self):
+        if self.granite.speculative_decoder is not None:
+            return self.granite.speculative_decoder.render()
+        return ""
+
+
+def create_responder(name=None):
+    """Responder by name, defaulting to ``CITIZENAI_RESPONDER`` and then Granite"""
+    name = name or os.environ.get('CITIZENAI_RESPONDER', 'granite')
+    if name == 'granite':
+        return GraniteResponder()
+    if name == 'demo':
+        return DemoResponder()
+    if name == 'stub':
+        return StubResponder.from_env()
+    raise ValueError(f"Unknown responder '{name}' (choose from {', '.join(RESPONDERS)})")
@@ -0,0 +1,91 @@
+"""
+CitizenAI Response Cache
+
+Bounded LRU cache with TTL for generated answers, keyed on a normalized form
+of the question so trivially different phrasings share one entry.
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+
+STOPWORDS = frozenset(
+    "a an the is are was were be been am do does did i me my we our you your "
+    "it its to of in on at for with and or please can could would will "
+    "what how when where who which there this that these those".split()
+)
+
+_NON_WORD = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_question(question):
+    """Lowercase, strip punctuation and stopwords, and collapse whitespace"""
+    text = _NON_WORD.sub(" ", question.lower())
+    words = [word for word in _WHITESPACE.split(text) if word and word not in STOPWORDS]
+    if not words:
+        # A question made only of stopwords still needs a stable key
+        return _WHITESPACE.sub(" ", text).strip()
+    return " ".join(words)
+
+
+class ResponseCache:
+    """Thread-safe LRU cache with per-entry expiry"""
+
+    def __init__(self, max_entries=1024, ttl_seconds=3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, question):
+        """Return the cached answer for ``question`` or ``None``"""
+        key = normalize_question(question)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, question, response):
+        """Store ``response`` for ``question``, evicting the least recently used entry when full"""
+        if self.max_entries <= 0:
+            return
+        key = normalize_question(question)
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._entries[key] = (response, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def flush(self):
+        """Drop every entry and return how many were removed"""
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            return count
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': (self.hits / lookups) if lookups else 0.0,
+            }
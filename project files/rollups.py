@@ -0,0 +1,85 @@
+"""
+CitizenAI Time-Windowed Rollups
+
+Per-minute, per-hour and per-day event counters kept in fixed-size ring
+buffers. Recording an event is O(1) and reading a window costs the number
+of buckets in it, never the size of the history.
+
+Buckets are aligned to UTC (day buckets start at midnight UTC) and
+labelled with their UTC start time. The counters live in the memory of
+one process: with several server processes each reports only the events
+it handled itself, and a restart starts from empty buckets.
+"""
+
+import threading
+import time
+from datetime import datetime, timezone
+
+EVENTS = ('ask', 'concern', 'positive', 'neutral', 'negative')
+
+# window name -> (bucket width in seconds, number of buckets kept)
+WINDOWS = {
+    'minute': (60, 60),    # last hour
+    'hour': (3600, 48),    # last two days
+    'day': (86400, 30),    # last thirty days
+}
+
+
+class RingSeries:
+    """Event counts for the most recent ``size`` buckets of ``width`` seconds"""
+
+    def __init__(self, width, size):
+        self.width = width
+        self.size = size
+        self._bucket_ids = [-1] * size
+        self._counts = [dict.fromkeys(EVENTS, 0) for _ in range(size)]
+
+    def add(self, event, amount, now):
+        bucket_id = int(now // self.width)
+        slot = bucket_id % self.size
+        if self._bucket_ids[slot] != bucket_id:
+            # The slot still holds an older bucket; recycle it
+            self._bucket_ids[slot] = bucket_id
+            counts = self._counts[slot]
+            for key in counts:
+                counts[key] = 0
+        self._counts[slot][event] += amount
+
+    def series(self, now):
+        """Oldest-to-newest list of buckets, empty ones included"""
+        current = int(now // self.width)
+        buckets = []
+        for bucket_id in range(current - self.size + 1, current + 1):
+            slot = bucket_id % self.size
+            if self._bucket_ids[slot] == bucket_id:
+                counts = dict(self._counts[slot])
+            else:
+                counts = dict.fromkeys(EVENTS, 0)
+            counts['start'] = datetime.fromtimestamp(bucket_id * self.width, timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+            buckets.append(counts)
+        return buckets
+
+
+class Rollups:
+    """Thread-safe set of ring series, one per window"""
+
+    def __init__(self, windows=WINDOWS, clock=time.time):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._series = {name: RingSeries(width, size) for name, (width, size) in windows.items()}
+
+    def record(self, event, amount=1):
+        if event not in EVENTS:
+            raise ValueError(f"Unknown rollup event '{event}'")
+        now = self._clock()
+        with self._lock:
+            for series in self._series.values():
+                series.add(event, amount, now)
+
+    def series(self, window, limit=None):
+        if window not in self._series:
+            raise ValueError(f"Unknown window '{window}'. Choose from: {', '.join(self._series)}")
+        now = self._clock()
+        with self._lock:
+            buckets = self._series[window].series(now)
+        return buckets[-limit:] if limit else buckets
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+CitizenAI Bulk Feedback Scorer
+
+Scores large CSV/JSONL feedback exports offline. The input is streamed in
+chunks, sentiment is computed across a process pool, results are written as
+they complete, and the totals can be added to the sentiment counters in the
+app's SQLite database, where the dashboard reads them. Memory use is bounded
+by the number of chunks in flight, not by the size of the file.
+
+    python score_feedback.py exports/feedback.jsonl -o scored.jsonl --db citizenai.db
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from sentiment import analyze_sentiment_batch
+from storage import Store
+
+EMPTY_TOTALS = {'positive': 0, 'neutral': 0, 'negative': 0}
+
+
+def detect_format(path, requested):
+    """Work out 'csv' or 'jsonl' from --format or the file extension"""
+    if requested != 'auto':
+        return requested
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        return 'csv'
+    if extension in ('.jsonl', '.ndjson', '.json'):
+        return 'jsonl'
+    raise SystemExit(f"Cannot tell the format of '{path}'; pass --format csv or --format jsonl")
+
+
+def read_records(handle, input_format):
+    """Yield input rows one at a time as dicts"""
+    if input_format == 'csv':
+        yield from csv.DictReader(handle)
+        return
+    for line in handle:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def chunked(iterable, size):
+    """Yield lists of up to ``size`` items"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def score_chunk(texts):
+    """Worker entry point: classify one chunk of texts"""
+    return analyze_sentiment_batch(texts)
+
+
+class ResultWriter:
+    """Writes scored rows incrementally as CSV or JSONL"""
+
+    def __init__(self, handle, output_format):
+        self.handle = handle
+        self.output_format = output_format
+        self._csv = None
+
+    def write(self, record, sentiment):
+        row = dict(record)
+        row['sentiment'] = sentiment
+        if self.output_format == 'jsonl':
+            self.handle.write(json.dumps(row) + '\n')
+            return
+        if self._csv is None:
+            self._csv = csv.DictWriter(self.handle, fieldnames=list(row), extrasaction='ignore')
+            self._csv.writeheader()
+        self._csv.writerow(row)
+
+
+def merge_totals(path, totals):
+    """Add ``totals`` to the sentiment counters of the app database at ``path`` and return the merged counts"""
+    store = Store(path)
+    try:
+        store.add_sentiment_counts(totals)
+        store.flush()
+        return store.sentiment_counts()
+    finally:
+        store.close()
+
+
+def score_file(records, text_field, writer, workers, chunk_size, max_inflight=None):
+    """Score ``records`` and return sentiment totals.
+
+    At most ``max_inflight`` chunks (default: two per worker) are submitted
+    ahead of the writer, which keeps memory constant and output in input order.
+    """
+    totals = dict(EMPTY_TOTALS)
+    max_inflight = max_inflight or workers * 2
+    pending = deque()
+
+    def drain_one():
+        chunk, future = pending.popleft()
+        for record, sentiment in zip(chunk, future.result()):
+            totals[sentiment.lower()] += 1
+            if writer is not None:
+                writer.write(record, sentiment)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk in chunked(records, chunk_size):
+            texts = [str(record.get(text_field) or '') for record in chunk]
+            pending.append((chunk, pool.submit(score_chunk, texts)))
+            if len(pending) >= max_inflight:
+                drain_one()
+        while pending:
+            drain_one()
+
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CitizenAI bulk feedback sentiment scorer")
+    parser.add_argument("input", help="CSV or JSONL file ('-' reads JSONL/CSV from stdin)")
+    parser.add_argument("-o", "--output", help="Write scored rows to this file ('-' for stdout)")
+    parser.add_argument("--format", choices=['auto', 'csv', 'jsonl'], default='auto', help="Input format")
+    parser.add_argument("--output-format", choices=['csv', 'jsonl'], default=None,
+                        help="Output format (default: same as input)")
+    parser.add_argument("--text-field", default='feedback', help="Column/key holding the feedback text")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--db", help="App SQLite database whose sentiment counters the totals are added to")
+    args = parser.parse_args()
+
+    if args.input == '-' and args.format == 'auto':
+        raise SystemExit("Pass --format when reading from stdin")
+    input_format = detect_format(args.input, args.format)
+    output_format = args.output_format or input_format
+
+    source = sys.stdin if args.input == '-' else open(args.input, newline='', encoding='utf-8')
+    sink = None
+    if args.output == '-':
+        sink = sys.stdout
+    elif args.output:
+        sink = open(args.output, 'w', newline='', encoding='utf-8')
+
+    try:
+        writer = ResultWriter(sink, output_format) if sink is not None else None
+        totals = score_file(read_records(source, input_format), args.text_field, writer,
+                            args.workers, args.chunk_size)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not None and sink is not sys.stdout:
+            sink.close()
+
+    if args.db:
+        totals = merge_totals(args.db, totals)
+    print(json.dumps(totals), file=sys.stderr if args.output == '-' else sys.stdout)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""
+CitizenAI Sentiment Engine
+
+Lexicon-based sentiment shared by the full and demo apps. Text is split
+into whole words in a single pass and each word is looked up in one
+precomputed table, so matching respects word boundaries ("issue" no longer
+matches inside "tissue") and short negations flip the next sentiment word
+("not helpful").
+"""
+
+import re
+from itertools import repeat
+
+POSITIVE_WORDS = (
+    'good', 'great', 'excellent', 'amazing', 'wonderful', 'fantastic', 'perfect',
+    'outstanding', 'brilliant', 'superb', 'satisfied', 'happy', 'pleased',
+    'impressed', 'helpful', 'efficient', 'fast', 'friendly', 'professional',
+)
+
+NEGATIVE_WORDS = (
+    'bad', 'terrible', 'awful', 'horrible', 'disappointing', 'frustrated', 'angry',
+    'upset', 'poor', 'inadequate', 'useless', 'slow', 'delayed', 'problem', 'issue',
+    'complaint', 'rude', 'unprofessional', 'broken',
+)
+
+# Apostrophes are stripped before lookup, so "isn't" is matched as "isnt"
+NEGATIONS = (
+    'not', 'no', 'never', 'neither', 'nor', 'nothing', 'hardly', 'barely', 'without',
+    'dont', 'doesnt', 'didnt', 'isnt', 'wasnt', 'arent', 'werent', 'cant', 'couldnt',
+    'wont', 'wouldnt', 'shouldnt', 'aint',
+)
+
+# How many words after a negation it still applies to ("not very helpful")
+NEGATION_WINDOW = 3
+
+# Every word is encoded as one byte: p(ositive), n(egative), x (negation) or
+# '.' for anything else. Counting and negation scoping then run as C-level
+# bytes operations over that code string instead of a Python loop per word.
+POSITIVE, NEGATIVE, NEGATION, OTHER = b'p', b'n', b'x', b'.'
+CODES = {word.encode(): POSITIVE for word in POSITIVE_WORDS}
+CODES.update({word.encode(): NEGATIVE for word in NEGATIVE_WORDS})
+CODES.update({word.encode(): NEGATION for word in NEGATIONS})
+
+# Byte translation: A-Z lowercased, a-z kept, everything else is a word separator
+_WORD_BYTES = bytearray(b' ' * 256)
+for _byte in range(ord('a'), ord('z') + 1):
+    _WORD_BYTES[_byte] = _byte
+    _WORD_BYTES[_byte - 32] = _byte
+_WORD_BYTES = bytes(_WORD_BYTES)
+
+# A negation followed by a sentiment word with at most NEGATION_WINDOW - 1 words between
+_NEGATED = re.compile(rb"x\.{0,%d}([pn])" % (NEGATION_WINDOW - 1))
+
+LABELS = ('Negative', 'Neutral', 'Positive')
+
+
+def _codes(text):
+    """Encode ``text`` as one code byte per word"""
+    words = text.replace('’', '').encode().translate(_WORD_BYTES, b"'").split()
+    return b''.join(map(CODES.get, words, repeat(OTHER)))
+
+
+def sentiment_scores(text):
+    """Return ``(positive_score, negative_score)`` for ``text``"""
+    codes = _codes(text)
+    positive = codes.count(POSITIVE)
+    negative = codes.count(NEGATIVE)
+
+    if NEGATION in codes:
+        for flipped in _NEGATED.findall(codes):
+            if flipped == POSITIVE:
+                positive -= 1
+                negative += 1
+            else:
+                negative -= 1
+                positive += 1
+
+    return positive, negative
+
+
+def label_scores(positive, negative):
+    """Map a score pair to 'Positive', 'Negative' or 'Neutral'"""
+    if positive > negative:
+        return 'Positive'
+    elif negative > positive:
+        return 'Negative'
+    else:
+        return 'Neutral'
+
+
+def analyze_sentiment(text):
+    """Classify ``text`` as 'Positive', 'Negative' or 'Neutral'"""
+    return label_scores(*sentiment_scores(text))
+
+
+def analyze_sentiment_batch(texts):
+    """Classify an iterable of texts, returning a list of labels in the same order"""
+    scores = sentiment_scores
+    labels = LABELS
+    results = []
+    append = results.append
+    for text in texts:
+        positive, negative = scores(text)
+        append(labels[(positive > negative) - (negative > positive) + 1])
+    return results
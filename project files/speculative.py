@@ -0,0 +1,168 @@
+"""
+CitizenAI Speculative Decoding
+
+Runs single-question ``model.generate`` calls as assisted generation: a
+much smaller draft model with the same tokenizer proposes a few tokens,
+and Granite checks all of them in one forward pass, keeping the prefix it
+agrees with. Each accepted token saves one full forward pass of the large
+model, so speed depends on how often the draft guesses right.
+
+Forward hooks on both models count passes made by the calling thread,
+which gives the acceptance rate of every call. When the rate over recent
+calls falls below a threshold, calls go back to plain decoding for a
+cooldown period and the draft is then tried again. Batched calls never use
+the draft: transformers only supports assisted generation for one row,
+and batching already amortizes the large model's passes.
+"""
+
+import threading
+import time
+from collections import deque
+
+from instrumentation import THROUGHPUT_BUCKETS, Histogram
+
+SPECULATIVE = 'speculative'
+STANDARD = 'standard'
+MODES = (SPECULATIVE, STANDARD)
+
+
+class SpeculativeDecoder:
+    """Draft model, per-call acceptance tracking and automatic fallback"""
+
+    def __init__(self, target, draft, draft_tokens=0, min_acceptance=0.35, window=20, cooldown=50):
+        self.draft = draft
+        self.min_acceptance = min_acceptance
+        self.cooldown = cooldown
+        if draft_tokens:
+            # Otherwise transformers adapts the number of draft tokens per round
+            draft.generation_config.num_assistant_tokens = draft_tokens
+            draft.generation_config.num_assistant_tokens_schedule = 'constant'
+
+        self._local = threading.local()
+        self._hooks = [
+            target.register_forward_hook(self._counter('target')),
+            draft.register_forward_hook(self._counter('draft')),
+        ]
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=window)   # (accepted, drafted) of recent speculative calls
+        self.active = True
+        self._cooldown_left = 0
+        self.fallbacks = 0
+        self.drafted = 0
+        self.accepted = 0
+        self.calls = dict.fromkeys(MODES, 0)
+        self.tokens = dict.fromkeys(MODES, 0)
+        self.seconds = dict.fromkeys(MODES, 0.0)
+        self.tokens_per_second = Histogram(
+            'citizenai_decoding_tokens_per_second', 'Generated tokens per second of single-question calls by decoding mode',
+            THROUGHPUT_BUCKETS, labelnames=('mode',))
+
+    def _counter(self, name):
+        def hook(module, inputs, output):
+            counts = getattr(self._local, 'counts', None)
+            if counts is not None:
+                counts[name] += 1
+        return hook
+
+    def close(self):
+        for handle in self._hooks:
+            handle.remove()
+
+    def generate(self, model, **kwargs):
+        """``model.generate`` with the draft model for single rows while it pays off"""
+        rows, prompt_length = kwargs['input_ids'].shape
+        if rows != 1:
+            return model.generate(**kwargs)
+
+        mode = SPECULATIVE if self._use_draft() else STANDARD
+        if mode == SPECULATIVE:
+            kwargs['assistant_model'] = self.draft
+        counts = self._local.counts = {'target': 0, 'draft': 0}
+        start = time.perf_counter()
+        try:
+            outputs = model.generate(**kwargs)
+        finally:
+            self._local.counts = None
+        sequences = getattr(outputs, 'sequences', outputs)
+        self._record(mode, counts, sequences.shape[1] - prompt_length, time.perf_counter() - start)
+        return outputs
+
+    def _use_draft(self):
+        with self._lock:
+            if self.active:
+                return True
+            self._cooldown_left -= 1
+            if self._cooldown_left <= 0:
+                # Inputs change over time; give the draft another chance
+                self.active = True
+                self._recent.clear()
+            return False
+
+    def _record(self, mode, counts, generated, seconds):
+        with self._lock:
+            self.calls[mode] += 1
+            self.tokens[mode] += generated
+            self.seconds[mode] += seconds
+            if mode == SPECULATIVE:
+                # Every verification pass of the large model yields the accepted
+                # draft tokens plus one token of its own
+                accepted = max(0, generated - counts['target'])
+                drafted = counts['draft']
+                self.accepted += accepted
+                self.drafted += drafted
+                self._recent.append((accepted, drafted))
+                rate = self._recent_rate()
+                if len(self._recent) == self._recent.maxlen and rate < self.min_acceptance:
+                    self.active = False
+                    self._cooldown_left = self.cooldown
+                    self.fallbacks += 1
+                    print(f"Speculative decoding paused: draft acceptance {rate:.0%} "
+                          f"below {self.min_acceptance:.0%} over the last {len(self._recent)} calls")
+        if seconds > 0:
+            self.tokens_per_second.observe(generated / seconds, mode)
+
+    def _recent_rate(self):
+        drafted = sum(d for _, d in self._recent)
+        return sum(a for a, _ in self._recent) / drafted if drafted else 0.0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'active': self.active,
+                'acceptance_rate_recent': round(self._recent_rate(), 3),
+                'acceptance_rate': round(self.accepted / self.drafted, 3) if self.drafted else 0.0,
+                'drafted_tokens': self.drafted,
+                'accepted_tokens': self.accepted,
+                'fallbacks': self.fallbacks,
+                'modes': {
+                    mode: {
+                        'calls': self.calls[mode],
+                        'tokens': self.tokens[mode],
+                        'tokens_per_second': round(self.tokens[mode] / self.seconds[mode], 1) if self.seconds[mode] else 0.0,
+                    }
+                    for mode in MODES
+                },
+            }
+
+    def render(self):
+        """Acceptance counters and per-mode throughput in the Prometheus text format"""
+        stats = self.stats()
+        lines = [
+            "# HELP citizenai_speculative_draft_tokens_total Tokens proposed by the draft model",
+            "# TYPE citizenai_speculative_draft_tokens_total counter",
+            f"citizenai_speculative_draft_tokens_total {stats['drafted_tokens']}",
+            "# HELP citizenai_speculative_accepted_tokens_total Draft tokens accepted by the main model",
+            "# TYPE citizenai_speculative_accepted_tokens_total counter",
+            f"citizenai_speculative_accepted_tokens_total {stats['accepted_tokens']}",
+            "# HELP citizenai_speculative_acceptance_rate Draft acceptance rate over recent calls",
+            "# TYPE citizenai_speculative_acceptance_rate gauge",
+            f"citizenai_speculative_acceptance_rate {stats['acceptance_rate_recent']}",
+            "# HELP citizenai_speculative_active Whether single-question calls currently use the draft model",
+            "# TYPE citizenai_speculative_active gauge",
+            f"citizenai_speculative_active {int(stats['active'])}",
+            "# HELP citizenai_speculative_fallbacks_total Times low acceptance switched back to plain decoding",
+            "# TYPE citizenai_speculative_fallbacks_total counter",
+            f"citizenai_speculative_fallbacks_total {stats['fallbacks']}",
+            self.tokens_per_second.render(),
+        ]
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,334 @@
+"""
+CitizenAI Storage Engine
+
+Durable storage for chat history, concerns and sentiment counters, backed by
+SQLite in WAL mode. Writes are queued and committed in batches by a
+background thread; totals and the most recent items are cached in RAM so
+dashboard reads don't touch the tables. Commits made by other processes
+sharing the database file are picked up through ``PRAGMA data_version``.
+"""
+
+import atexit
+import sqlite3
+import threading
+from collections import deque
+from datetime import datetime
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS chat_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    question TEXT NOT NULL,
+    response TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_chat_history_timestamp ON chat_history (timestamp);
+
+CREATE TABLE IF NOT EXISTS concerns (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    text TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'Open'
+);
+CREATE INDEX IF NOT EXISTS idx_concerns_timestamp ON concerns (timestamp);
+CREATE INDEX IF NOT EXISTS idx_concerns_status ON concerns (status, timestamp);
+
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+COUNTER_NAMES = ('chats', 'concerns', 'open_concerns', 'positive', 'neutral', 'negative')
+SENTIMENT_KEYS = ('positive', 'neutral', 'negative')
+
+# Columns returned by the history/concerns APIs, per table
+TABLE_COLUMNS = {
+    'chat_history': ('id', 'timestamp', 'question', 'response'),
+    'concerns': ('id', 'timestamp', 'text', 'status'),
+}
+SORT_KEYS = ('id', 'timestamp')
+
+
+def now_timestamp():
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+class Store:
+    """SQLite-backed store with batched writes and an in-memory recent cache"""
+
+    def __init__(self, path, recent_limit=50, batch_size=100, flush_interval=0.5):
+        self.path = path
+        self.recent_limit = recent_limit
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        # One connection guarded by a lock: its own commits never bump
+        # data_version, so a change there always means another process wrote.
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(SCHEMA)
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO counters (name, value) VALUES (?, 0)",
+            [(name,) for name in COUNTER_NAMES]
+        )
+
+        self._lock = threading.RLock()
+        self._pending = []
+        self._counters = {}
+        self._recent_chats = deque(maxlen=recent_limit)
+        self._recent_concerns = deque(maxlen=recent_limit)
+        self._load_cache()
+        self._data_version = self._read_data_version()
+
+        self._stopped = threading.Event()
+        self._writer = threading.Thread(target=self._flush_periodically, name="citizenai-store-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    # Writes
+
+    def add_chat(self, question, response, timestamp=None):
+        entry = {'timestamp': timestamp or now_timestamp(), 'question': question, 'response': response}
+        with self._lock:
+            self._pending.append(('chat', entry))
+            self._recent_chats.append(entry)
+            self._counters['chats'] += 1
+            self._maybe_flush()
+        return entry
+
+    def add_concern(self, text, status='Open', timestamp=None):
+        entry = {'timestamp': timestamp or now_timestamp(), 'text': text, 'status': status}
+        with self._lock:
+            self._pending.append(('concern', entry))
+            self._recent_concerns.append(entry)
+            self._counters['concerns'] += 1
+            if status == 'Open':
+                self._counters['open_concerns'] += 1
+            self._maybe_flush()
+        return entry
+
+    def increment_sentiment(self, key, amount=1):
+        if key not in SENTIMENT_KEYS:
+            return
+        with self._lock:
+            self._pending.append(('counter', (key, amount)))
+            self._counters[key] += amount
+            self._maybe_flush()
+
+    def add_sentiment_counts(self, deltas):
+        """Apply several sentiment increments (``{key: amount}``) in one batch"""
+        with self._lock:
+            for key, amount in deltas.items():
+                self.increment_sentiment(key, amount)
+
+    def set_concern_status(self, concern_id, status):
+        """Change a concern's status; returns False if it doesn't exist"""
+        with self._lock:
+            self._flush_locked()
+            row = self._conn.execute("SELECT status FROM concerns WHERE id = ?", (concern_id,)).fetchone()
+            if row is None:
+                return False
+            delta = (status == 'Open') - (row['status'] == 'Open')
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.execute("UPDATE concerns SET status = ? WHERE id = ?", (status, concern_id))
+            if delta:
+                self._conn.execute("UPDATE counters SET value = value + ? WHERE name = 'open_concerns'", (delta,))
+            self._conn.execute("COMMIT")
+            self._counters['open_concerns'] += delta
+            for entry in self._recent_concerns:
+                if entry.get('id') == concern_id:
+                    entry['status'] = status
+            return True
+
+    # Reads (served from the in-memory cache)
+
+    def sentiment_counts(self):
+        with self._lock:
+            self._sync_external()
+            return {key: self._counters[key] for key in SENTIMENT_KEYS}
+
+    def counts(self):
+        with self._lock:
+            self._sync_external()
+            return dict(self._counters)
+
+    def recent_chats(self, limit=10):
+        with self._lock:
+            self._sync_external()
+            return list(self._recent_chats)[-limit:]
+
+    def recent_concerns(self, limit=10):
+        with self._lock:
+            self._sync_external()
+            return list(self._recent_concerns)[-limit:]
+
+    def concerns_after(self, concern_id, limit=None, newest=False):
+        """Committed concerns with an id above ``concern_id``, oldest first.
+
+        With ``newest`` the ``limit`` most recent of them are returned instead
+        of the oldest.
+        """
+        order = 'DESC' if newest else 'ASC'
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, timestamp, text, status FROM concerns WHERE id > ? ORDER BY id {order} LIMIT ?",
+                (concern_id, -1 if limit is None else limit)
+            ).fetchall()
+        rows = [dict(row) for row in rows]
+        return rows[::-1] if newest else rows
+
+    def query_page(self, table, after=None, limit=100, since=None, until=None, status=None,
+                   sort='id', descending=False):
+        """One page of committed rows using keyset pagination.
+
+        ``after`` is the ``(timestamp, id)`` of the last row of the previous
+        page; the next page's key is returned alongside the rows (``None``
+        at the end). ``since`` is inclusive and ``until`` exclusive, both
+        compared against the stored ``YYYY-MM-DD HH:MM:SS`` timestamps.
+        """
+        if table not in TABLE_COLUMNS:
+            raise ValueError(f"Unknown table '{table}'")
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key '{sort}'")
+        columns = TABLE_COLUMNS[table]
+        conditions, params = [], []
+        if after is not None:
+            comparison = '<' if descending else '>'
+            if sort == 'id':
+                conditions.append(f"id {comparison} ?")
+                params.append(after[1])
+            else:
+                conditions.append(f"(timestamp, id) {comparison} (?, ?)")
+                params.extend(after)
+        if since:
+            conditions.append("timestamp >= ?")
+            params.append(since)
+        if until:
+            conditions.append("timestamp < ?")
+            params.append(until)
+        if status is not None:
+            if 'status' not in columns:
+                raise ValueError(f"'{table}' has no status column")
+            conditions.append("status = ?")
+            params.append(status)
+
+        direction = 'DESC' if descending else 'ASC'
+        order = f"id {direction}" if sort == 'id' else f"timestamp {direction}, id {direction}"
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        sql = f"SELECT {', '.join(columns)} FROM {table} {where} ORDER BY {order} LIMIT ?"
+
+        with self._lock:
+            # Make this process's queued writes visible to the query
+            self._flush_locked()
+            rows = self._conn.execute(sql, params + [limit + 1]).fetchall()
+        rows = [dict(row) for row in rows]
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, (rows[-1]['timestamp'], rows[-1]['id'])
+
+    def iter_pages(self, table, page_size=1000, **filters):
+        """Yield successive pages of rows; each query is short, so memory and lock time stay constant"""
+        after = None
+        while True:
+            rows, after = self.query_page(table, after=after, limit=page_size, **filters)
+            if rows:
+                yield rows
+            if after is None:
+                return
+
+    # Persistence
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def close(self):
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        self.flush()
+        self._conn.close()
+
+    def _maybe_flush(self):
+        if len(self._pending) >= self.batch_size:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._pending:
+            return
+        # Take the batch only once the write lock is ours: a busy database
+        # (another process holding the file) leaves it queued for the next flush
+        self._conn.execute("BEGIN IMMEDIATE")
+        pending, self._pending = self._pending, []
+        deltas = {}
+
+        try:
+            for kind, payload in pending:
+                if kind == 'chat':
+                    cursor = self._conn.execute(
+                        "INSERT INTO chat_history (timestamp, question, response) VALUES (?, ?, ?)",
+                        (payload['timestamp'], payload['question'], payload['response'])
+                    )
+                    payload['id'] = cursor.lastrowid
+                    deltas['chats'] = deltas.get('chats', 0) + 1
+                elif kind == 'concern':
+                    cursor = self._conn.execute(
+                        "INSERT INTO concerns (timestamp, text, status) VALUES (?, ?, ?)",
+                        (payload['timestamp'], payload['text'], payload['status'])
+                    )
+                    payload['id'] = cursor.lastrowid
+                    deltas['concerns'] = deltas.get('concerns', 0) + 1
+                    if payload['status'] == 'Open':
+                        deltas['open_concerns'] = deltas.get('open_concerns', 0) + 1
+                else:
+                    key, amount = payload
+                    deltas[key] = deltas.get(key, 0) + amount
+            self._conn.executemany(
+                "UPDATE counters SET value = value + ? WHERE name = ?",
+                [(amount, name) for name, amount in deltas.items()]
+            )
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            self._pending = pending + self._pending
+            raise
+
+    def _flush_periodically(self):
+        while not self._stopped.wait(self.flush_interval):
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                print(f"Error flushing store: {e}")
+
+    def _read_data_version(self):
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _sync_external(self):
+        """Reload the cache if another process has committed since we last looked"""
+        version = self._read_data_version()
+        if version == self._data_version:
+            return
+        self._flush_locked()
+        self._load_cache()
+        self._data_version = self._read_data_version()
+
+    def _load_cache(self):
+        rows = self._conn.execute("SELECT name, value FROM counters").fetchall()
+        self._counters = {name: 0 for name in COUNTER_NAMES}
+        self._counters.update({row['name']: row['value'] for row in rows})
+
+        chats = self._conn.execute(
+            "SELECT id, timestamp, question, response FROM chat_history ORDER BY id DESC LIMIT ?",
+            (self.recent_limit,)
+        ).fetchall()
+        self._recent_chats = deque((dict(row) for row in reversed(chats)), maxlen=self.recent_limit)
+
+        concerns = self._conn.execute(
+            "SELECT id, timestamp, text, status FROM concerns ORDER BY id DESC LIMIT ?",
+            (self.recent_limit,)
+        ).fetchall()
+        self._recent_concerns = deque((dict(row) for row in reversed(concerns)), maxlen=self.recent_limit)
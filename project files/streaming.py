@@ -0,0 +1,66 @@
+"""
+CitizenAI Streaming Helpers
+
+Server-sent event formatting and time-to-first-token measurement for the
+``/ask/stream`` endpoint.
+"""
+
+import json
+import time
+
+
+def sse_event(data, event=None):
+    """Format ``data`` as a single server-sent event"""
+    lines = []
+    if event:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def stream_answer(pieces, on_complete, instrumentation=None):
+    """Relay text ``pieces`` as SSE ``token`` events, then a final ``done`` event.
+
+    ``on_complete`` is called with the full answer once the stream finishes,
+    so callers can persist it; an empty answer is not passed on. If
+    ``pieces`` raises, an ``error`` event with an apology replaces ``done``. Latency is measured from the first call to the
+    generator, which is when Flask starts sending the response, and recorded
+    in ``instrumentation`` when given.
+    """
+    start = time.perf_counter()
+    first_token_at = None
+    parts = []
+
+    try:
+        for piece in pieces:
+            if not piece:
+                continue
+            if first_token_at is None:
+                first_token_at = time.perf_counter() - start
+            parts.append(piece)
+            yield sse_event({'token': piece})
+    except Exception as e:
+        print(f"Error streaming response: {e}")
+        yield sse_event({'error': "I apologize, but I'm experiencing technical difficulties. Please try again later."}, event='error')
+        return
+    finally:
+        # Runs on client disconnect too, so the source can cancel its generation
+        close = getattr(pieces, 'close', None)
+        if close is not None:
+            close()
+
+    duration = time.perf_counter() - start
+    if first_token_at is None:
+        first_token_at = duration
+    if instrumentation is not None:
+        instrumentation.observe_stream(first_token_at, duration)
+
+    response = "".join(parts).strip()
+    if response:
+        on_complete(response)
+
+    yield sse_event({
+        'response': response,
+        'ttft_ms': round(first_token_at * 1000, 1),
+        'total_ms': round(duration * 1000, 1),
+    }, event='done')
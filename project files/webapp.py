@@ -0,0 +1,384 @@
+"""
+CitizenAI Web App
+
+``create_app`` builds the Flask app shared by every deployment: pages,
+chat, feedback, concerns, dashboard, admin and metrics routes over one
+store. Only the responder that answers questions the intent router can't
+differs (see ``responders.py``); ``app.py`` runs Granite and
+``app_demo.py`` the canned demo answers.
+"""
+
+from flask import Flask, render_template, request, redirect, url_for, session, flash, Response, stream_with_context, jsonify, make_response
+import os
+import time
+
+from concern_index import ConcernIndex
+from counters import ShardedCounter
+from deadlines import REQUEST_DEADLINE_SECONDS, GenerationControl
+from history_api import history_response
+from inference_queue import Overloaded
+from instrumentation import Instrumentation
+from intent_router import IntentRouter
+from page_cache import PageCache
+from responders import Responder, create_responder
+from rollups import Rollups, WINDOWS
+from sentiment import analyze_sentiment
+from storage import SENTIMENT_KEYS, Store
+from streaming import stream_answer
+
+def create_app(responder=None, intents=None, db_path=None):
+    """Build the CitizenAI Flask app around ``responder`` (a Responder or a responder name)"""
+    if not isinstance(responder, Responder):
+        responder = create_responder(responder)
+    if intents is None:
+        intents = os.environ.get('CITIZENAI_INTENT_ROUTER', '1') == '1'
+    
+    # Initialize Flask app
+    app = Flask(__name__)
+    app.secret_key = os.environ.get('CITIZENAI_SECRET_KEY', 'your-secret-key-change-this-in-production')
+    
+    # Home/about/services rendered once; static files fingerprinted, precompressed and served from memory
+    page_cache = PageCache(app)
+    
+    # Persistent storage for chat history, concerns and sentiment counters
+    store = Store(db_path or os.environ.get('CITIZENAI_DB_PATH', responder.database))
+    
+    # Lock-free per-thread sentiment counters, flushed into the shared store
+    sentiment_counter = ShardedCounter(SENTIMENT_KEYS, sink=store.add_sentiment_counts, source=store.sentiment_counts)
+    
+    # Per-minute/hour/day activity rollups for the dashboard
+    rollups = Rollups()
+    
+    # Search index and near-duplicate clusters over the most recent concerns, built from the store
+    concern_index = ConcernIndex(max_docs=int(os.environ.get('CITIZENAI_CONCERN_INDEX_SIZE', '50000')))
+    concern_index.catch_up(store)
+    
+    # Keyword fast-path that answers common questions without calling the responder
+    intent_router = None
+    if intents:
+        intent_router = IntentRouter.from_file()
+    
+    # Per-stage inference timers, token counts and route latency exported on /metrics
+    instrumentation = Instrumentation.from_env().install(app)
+    responder.install(app, instrumentation)
+    
+    # Bounded queue in front of model calls; when it is full questions get a fast 503
+    inference_queue = responder.inference_queue
+    
+    app.extensions['citizenai'] = {
+        'responder': responder,
+        'store': store,
+        'intent_router': intent_router,
+        'instrumentation': instrumentation,
+        'inference_queue': inference_queue,
+    }
+    
+    def route_intent(question, conversation=None):
+        """Intent fast-path match, or None. Follow-ups always go to the responder,
+        since a canned answer can't take the earlier turns into account."""
+        if intent_router is None or (conversation is not None and conversation.turns):
+            return None
+        return intent_router.route(question)
+
+    def generate_answer(question, conversation=None):
+        """Answer from the intent fast-path when confident, otherwise from the responder"""
+        match = route_intent(question, conversation)
+        if match is not None:
+            if conversation is not None:
+                responder.remember(conversation, question, match.response)
+            return match.response
+        
+        # Raises Overloaded when the inference queue is full; the deadline includes queue wait
+        control = GenerationControl(REQUEST_DEADLINE_SECONDS)
+        start = time.perf_counter()
+        if inference_queue is not None:
+            response = inference_queue.call(responder.answer, question, control, conversation)
+        else:
+            response = responder.answer(question, control, conversation)
+        if intent_router is not None:
+            intent_router.observe_fallback(time.perf_counter() - start)
+        return response
+
+    def generate_answer_stream(question, conversation=None):
+        """Streaming counterpart of generate_answer; returns ``(pieces, release)``.
+        
+        Admission happens here, before the response starts, so a full queue can
+        still be reported as a 503 instead of an error event mid-stream. A
+        generator that is closed before it starts never runs its ``finally``,
+        so the caller must also call ``release`` (``None`` when no queue slot
+        was taken) once the response is closed.
+        """
+        match = route_intent(question, conversation)
+        if match is not None:
+            if conversation is not None:
+                responder.remember(conversation, question, match.response)
+            return iter([match.response]), None
+        
+        release = inference_queue.admit() if inference_queue is not None else None
+        control = GenerationControl(REQUEST_DEADLINE_SECONDS)
+        return responder_answer_stream(question, release, control, conversation), release
+
+    def responder_answer_stream(question, release, control, conversation=None):
+        """Stream the responder's answer, freeing the admitted queue slot when done"""
+        try:
+            start = time.perf_counter()
+            yield from responder.stream(question, control, conversation)
+            if intent_router is not None:
+                intent_router.observe_fallback(time.perf_counter() - start)
+        finally:
+            if release is not None:
+                release()
+
+    # Routes
+    @app.route('/')
+    def index():
+        """Home page"""
+        return page_cache.serve('index.html')
+
+    @app.route('/about')
+    def about():
+        """About page"""
+        return page_cache.serve('about.html')
+
+    @app.route('/services')
+    def services():
+        """Services page"""
+        return page_cache.serve('services.html')
+
+    @app.route('/chat')
+    def chat():
+        """Chat interface page"""
+        if 'logged_in' not in session:
+            return redirect(url_for('login'))
+        return render_template('chat.html')
+
+    @app.route('/ask', methods=['POST'])
+    def ask_question():
+        """Handle chat questions"""
+        if 'logged_in' not in session:
+            return redirect(url_for('login'))
+        
+        question = request.form.get('question', '').strip()
+        
+        if not question:
+            return render_template('chat.html', error="Please enter a question.")
+        
+        # Generate AI response (follow-ups see the earlier questions of this session)
+        response = generate_answer(question, responder.conversation(session))
+        
+        # Store in chat history
+        store.add_chat(question, response)
+        rollups.record('ask')
+        
+        return render_template('chat.html', question_response=response, user_question=question)
+
+    @app.route('/ask/stream', methods=['POST'])
+    def ask_question_stream():
+        """Stream the chat answer token by token as server-sent events"""
+        if 'logged_in' not in session:
+            return redirect(url_for('login'))
+        
+        question = request.form.get('question', '').strip()
+        
+        if not question:
+            return render_template('chat.html', error="Please enter a question.")
+        
+        pieces, release = generate_answer_stream(question, responder.conversation(session))
+        rollups.record('ask')
+        events = stream_answer(pieces, lambda response: store.add_chat(question, response), instrumentation)
+        response = Response(stream_with_context(events), mimetype='text/event-stream',
+                            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+        if release is not None:
+            # Frees the queue slot even if the client leaves before the first chunk
+            response.call_on_close(release)
+        return response
+
+    @app.route('/chat/new', methods=['POST'])
+    def new_conversation():
+        """Forget the earlier questions of this session"""
+        if 'logged_in' not in session:
+            return redirect(url_for('login'))
+        
+        responder.forget(session)
+        return redirect(url_for('chat'))
+
+    @app.route('/feedback', methods=['POST'])
+    def submit_feedback():
+        """Handle sentiment analysis"""
+        if 'logged_in' not in session:
+            return redirect(url_for('login'))
+        
+        feedback_text = request.form.get('feedback', '').strip()
+        
+        if not feedback_text:
+            return render_template('chat.html', error="Please enter feedback text.")
+        
+        # Analyze sentiment
+        sentiment = analyze_sentiment(feedback_text)
+        
+        # Update sentiment counts
+        sentiment_counter.increment(sentiment.lower())
+        rollups.record(sentiment.lower())
+        
+        return render_template('chat.html', sentiment=sentiment, feedback_text=feedback_text)
+
+    @app.route('/concern', methods=['POST'])
+    def submit_concern():
+        """Handle concern reporting"""
+        if 'logged_in' not in session:
+            return redirect(url_for('login'))
+        
+        concern_text = request.form.get('concern', '').strip()
+        
+        if not concern_text:
+            return render_template('chat.html', error="Please enter your concern.")
+        
+        # Store concern
+        entry = store.add_concern(concern_text)
+        cluster = concern_index.add(entry)
+        rollups.record('concern')
+        
+        return render_template('chat.html', concern_submitted=True, similar_reports=cluster['size'] - 1)
+
+    @app.route('/concerns/search')
+    def search_concerns():
+        """Full-text concern search (all words must match), or the members of one cluster"""
+        if 'logged_in' not in session:
+            return redirect(url_for('login'))
+        
+        query = request.args.get('q', '').strip()
+        cluster_id = request.args.get('cluster', type=int)
+        status = request.args.get('status') or None
+        limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+        
+        # Write pending concerns first so every result carries its database id
+        store.flush()
+        concern_index.catch_up(store)
+        if cluster_id is not None:
+            results = concern_index.cluster(cluster_id, limit)
+            return jsonify({'cluster': cluster_id, 'total': len(results), 'results': results})
+        if not query:
+            return jsonify({'error': "Pass a search query as ?q=... or a cluster id as ?cluster=..."}), 400
+        
+        total, results = concern_index.search(query, limit=limit, status=status)
+        return jsonify({'query': query, 'total': total, 'results': results})
+
+    @app.route('/dashboard')
+    def dashboard():
+        """Dashboard page with analytics"""
+        if 'logged_in' not in session:
+            return redirect(url_for('login'))
+        
+        # Get recent concerns (last 10)
+        recent_concerns = store.recent_concerns(10)
+        counts = store.counts()
+        concern_index.catch_up(store)
+        
+        return render_template('dashboard.html', 
+                             sentiment_data=sentiment_counter.totals(), 
+                             recent_concerns=recent_concerns,
+                             total_interactions=counts['chats'],
+                             total_concerns=counts['concerns'],
+                             open_concerns=counts['open_concerns'],
+                             top_clusters=concern_index.top_clusters(5))
+
+    @app.route('/admin/intents', methods=['GET'])
+    def intent_stats():
+        """Intent fast-path hit rate and latency saved"""
+        if 'logged_in' not in session:
+            return redirect(url_for('login'))
+        
+        if intent_router is None:
+            return jsonify({'enabled': False})
+        return jsonify({'enabled': True, **intent_router.stats()})
+
+    @app.route('/healthz')
+    def healthz():
+        """Liveness probe: the web server is up, whatever the model state"""
+        queue_stats = inference_queue.stats() if inference_queue is not None else None
+        return jsonify({'status': 'ok', 'model': responder.snapshot(), 'inference_queue': queue_stats})
+
+    @app.route('/readyz')
+    def readyz():
+        """Readiness probe: 200 only once the model is loaded and warmed up"""
+        return jsonify(responder.snapshot()), (200 if responder.is_ready() else 503)
+
+    @app.route('/metrics')
+    def prometheus_metrics():
+        """Prometheus scrape endpoint: inference stage, token and route latency histograms"""
+        body = instrumentation.render() + responder.metrics()
+        return Response(body, mimetype='text/plain; version=0.0.4')
+
+    @app.route('/api/metrics')
+    def metrics_api():
+        """Windowed activity series and totals for the dashboard"""
+        if 'logged_in' not in session:
+            return redirect(url_for('login'))
+        
+        window = request.args.get('window', 'minute')
+        if window not in WINDOWS:
+            return jsonify({'error': f"Unknown window '{window}'", 'windows': list(WINDOWS)}), 400
+        _, buckets = WINDOWS[window]
+        limit = min(max(request.args.get('limit', buckets, type=int), 1), buckets)
+        
+        return jsonify({
+            'window': window,
+            'series': rollups.series(window, limit),
+            'totals': {**store.counts(), **sentiment_counter.totals()}
+        })
+
+    @app.errorhandler(Overloaded)
+    def inference_overloaded(error):
+        """Shed load with a fast 503 while the inference queue is full"""
+        message = "We're receiving a lot of questions right now. Please try again in a few seconds."
+        if request.endpoint == 'ask_question_stream':
+            response = jsonify({'error': message, 'retry_after': error.retry_after})
+        else:
+            response = make_response(render_template('chat.html', error=message))
+        response.status_code = 503
+        response.headers['Retry-After'] = str(error.retry_after)
+        return response
+
+    @app.route('/api/history')
+    def history_api():
+        """Chat history with cursor pagination; ?format=jsonl streams a full export"""
+        if 'logged_in' not in session:
+            return redirect(url_for('login'))
+        
+        return history_response(store, 'chat_history')
+
+    @app.route('/api/concerns')
+    def concerns_api():
+        """Concerns with cursor pagination and status filter; ?format=jsonl streams a full export"""
+        if 'logged_in' not in session:
+            return redirect(url_for('login'))
+        
+        return history_response(store, 'concerns', allow_status=True)
+
+    @app.route('/login', methods=['GET', 'POST'])
+    def login():
+        """Login page"""
+        if request.method == 'POST':
+            username = request.form.get('username', '').strip()
+            password = request.form.get('password', '').strip()
+            
+            # Simple authentication (replace with proper auth in production)
+            if username == 'admin' and password == 'password':
+                session['logged_in'] = True
+                session['username'] = username
+                flash('Login successful!', 'success')
+                return redirect(url_for('chat'))
+            else:
+                flash('Invalid username or password.', 'error')
+        
+        return render_template('login.html')
+
+    @app.route('/logout')
+    def logout():
+        """Logout route"""
+        responder.forget(session)
+        session.clear()
+        flash('You have been logged out.', 'info')
+        return redirect(url_for('index'))
+    
+    return app